@@ -1,93 +1,253 @@
-"""
-Smart Door Security System - Configuration Settings
-All system-wide configurations are defined here.
-"""
-
-import os
-from pathlib import Path
-
-# Base directory
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-# Database settings
-DATABASE_PATH = BASE_DIR / "database" / "smart_door.db"
-
-# Camera settings
-CAMERA_INDEX = 0  # Default camera (0 = built-in webcam)
-CAMERA_WIDTH = 640
-CAMERA_HEIGHT = 480
-CAMERA_FPS = 30
-
-# Face recognition settings
-FACE_RECOGNITION_TOLERANCE = 0.6  # Lower = stricter matching
-FACE_DETECTION_MODEL = "hog"  # "hog" for CPU, "cnn" for GPU
-FACE_ENCODING_JITTERS = 1  # Higher = more accurate but slower
-
-# Fingerprint sensor settings
-FINGERPRINT_PORT = "COM3"  # Change based on your system
-FINGERPRINT_BAUD_RATE = 57600
-FINGERPRINT_TIMEOUT = 5  # seconds
-
-# Door control settings
-DOOR_UNLOCK_DURATION = 5  # seconds before auto-lock
-DOOR_RELAY_PIN = 17  # GPIO pin for relay (Raspberry Pi)
-
-# Web server settings
-WEB_HOST = "127.0.0.1"
-WEB_PORT = 5000
-SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-change-in-production-123!")
-
-# API settings
-API_BASE_URL = f"http://{WEB_HOST}:{WEB_PORT}/api"
-
-# Logging settings
-LOG_DIR = BASE_DIR / "logs"
-LOG_FILE = LOG_DIR / "system.log"
-LOG_LEVEL = "INFO"
-
-# Enrollment settings
-ENROLLMENT_DIR = BASE_DIR / "enrollments"
-MAX_FACE_SAMPLES = 5  # Number of face samples during enrollment
-
-# Security settings
-PASSWORD_MIN_LENGTH = 8
-MAX_LOGIN_ATTEMPTS = 5  # Re-added for security
-LOCKOUT_DURATION = 300  # seconds
-RATE_LIMIT_REQUESTS = 10  # API rate limiting
-RATE_LIMIT_WINDOW = 60  # seconds
-
-# Threading settings
-THREAD_TIMEOUT = 30  # seconds for thread operations
-MAX_CONCURRENT_THREADS = 10
-
-# Camera settings (optimized)
-CAMERA_BUFFER_SIZE = 1  # Reduce buffer for faster processing
-CAMERA_FRAME_TIMEOUT = 5  # seconds
-CAMERA_RETRY_ATTEMPTS = 3
-
-# Sensor settings (optimized)
-SENSOR_RETRY_ATTEMPTS = 3
-SENSOR_RETRY_DELAY = 1  # seconds
-SENSOR_CONNECTION_TIMEOUT = 10  # seconds
-
-# Authentication settings
-AUTH_RETRY_ATTEMPTS = 3
-AUTH_RETRY_DELAY = 2  # seconds
-CONFIDENCE_THRESHOLD = 0.6  # Minimum confidence for face match
-
-# Door settings
-DOOR_STATE_CHECK_INTERVAL = 1  # seconds
-DOOR_EMERGENCY_TIMEOUT = 60  # seconds max unlock time
-DOOR_RETRY_ATTEMPTS = 3
-
-# Memory management
-MAX_FRAME_HISTORY = 100  # Limit frame cache
-GC_THRESHOLD = 100  # Force garbage collection every N frames
-
-# GUI settings
-GUI_UPDATE_INTERVAL = 50  # milliseconds
-GUI_WINDOW_WIDTH = 1200
-GUI_WINDOW_HEIGHT = 800
-
-# Authentication timeout
-AUTH_TIMEOUT = 30  # seconds to complete both authentications
+"""
+Smart Door Security System - Configuration Settings
+All system-wide configurations are defined here.
+
+The UPPER_CASE constants below are the defaults; they are folded into the
+immutable CONFIG snapshot at import time, where any of them can be
+overridden through a SMARTDOOR_<NAME> environment variable.
+"""
+
+import os
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict
+
+# Base directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Database settings
+DATABASE_PATH = BASE_DIR / "database" / "smart_door.db"
+# High-churn tables (access/system logs, sessions) live in their own file
+# so their writes never churn the main database's page cache
+LOGS_DATABASE_PATH = BASE_DIR / "database" / "smart_door_logs.db"
+
+# SQLite tuning (applied once per connection)
+SQLITE_JOURNAL_MODE = "WAL"  # Write-ahead logging for concurrent reads
+SQLITE_SYNCHRONOUS = "NORMAL"  # Safe with WAL; avoids fsync per commit
+SQLITE_BUSY_TIMEOUT = 5000  # milliseconds to wait on a locked database
+SQLITE_CACHE_SIZE = -20000  # Negative = KiB, so 20 MB page cache
+SQLITE_TEMP_STORE = "MEMORY"  # Keep temp tables/indices off disk
+SQLITE_MMAP_SIZE = 268435456  # 256 MB memory-mapped IO window
+SQLITE_LOGS_SYNCHRONOUS = "OFF"  # Logs tolerate loss of the last moments on crash
+
+# Camera settings
+CAMERA_INDEX = 0  # Default camera (0 = built-in webcam)
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+CAMERA_FPS = 30
+
+# Face recognition settings
+FACE_RECOGNITION_TOLERANCE = 0.6  # Lower = stricter matching
+# Detection runs on a quarter-resolution frame; "hog" is the practical
+# choice on CPU-only hardware, "cnn" needs a CUDA-enabled dlib build
+FACE_DETECTION_MODEL = "hog"
+FACE_ENCODING_JITTERS = 1  # Higher = more accurate but slower
+
+# Fingerprint sensor settings
+FINGERPRINT_PORT = "COM3"  # Change based on your system
+FINGERPRINT_BAUD_RATE = 57600
+FINGERPRINT_TIMEOUT = 5  # seconds
+
+# Door control settings
+DOOR_UNLOCK_DURATION = 5  # seconds before auto-lock
+DOOR_RELAY_PIN = 17  # GPIO pin for relay (Raspberry Pi)
+
+# Web server settings
+WEB_HOST = "127.0.0.1"
+WEB_PORT = 5000
+SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-change-in-production-123!")
+
+# API settings
+API_BASE_URL = f"http://{WEB_HOST}:{WEB_PORT}/api"
+
+# Logging settings
+LOG_DIR = BASE_DIR / "logs"
+LOG_FILE = LOG_DIR / "system.log"
+LOG_LEVEL = "INFO"
+
+# Enrollment settings
+ENROLLMENT_DIR = BASE_DIR / "enrollments"
+MAX_FACE_SAMPLES = 8  # Upper bound on face samples during enrollment
+MIN_FACE_SAMPLES = 3  # Enough to stop early when samples agree closely
+FACE_SAMPLE_TARGET_STD = 0.08  # Mean per-dim std below which capture stops
+
+# Security settings
+# bcrypt's library default is 12 rounds (~0.8s on Pi-class hardware); 10
+# is the OWASP floor and keeps an admin login around 100ms here. Each +1
+# doubles the cost.
+BCRYPT_COST = 10
+PASSWORD_MIN_LENGTH = 8
+MAX_LOGIN_ATTEMPTS = 5  # Re-added for security
+LOCKOUT_DURATION = 300  # seconds
+RATE_LIMIT_REQUESTS = 10  # API rate limiting
+RATE_LIMIT_WINDOW = 60  # seconds
+
+# Threading settings
+THREAD_TIMEOUT = 30  # seconds for thread operations
+MAX_CONCURRENT_THREADS = 10
+
+# Camera settings (optimized)
+CAMERA_BUFFER_SIZE = 1  # Reduce buffer for faster processing
+CAMERA_FRAME_TIMEOUT = 5  # seconds
+CAMERA_RETRY_ATTEMPTS = 3
+
+# Sensor settings (optimized)
+SENSOR_RETRY_ATTEMPTS = 3
+SENSOR_RETRY_DELAY = 1  # seconds
+SENSOR_CONNECTION_TIMEOUT = 10  # seconds
+
+# Authentication settings
+AUTH_RETRY_ATTEMPTS = 3
+AUTH_RETRY_DELAY = 2  # seconds
+CONFIDENCE_THRESHOLD = 0.6  # Minimum confidence for face match
+
+# Door settings
+DOOR_STATE_CHECK_INTERVAL = 1  # seconds
+DOOR_EMERGENCY_TIMEOUT = 60  # seconds max unlock time
+DOOR_RETRY_ATTEMPTS = 3
+
+# Memory management
+MAX_FRAME_HISTORY = 100  # Limit frame cache
+GC_THRESHOLD = 100  # Force garbage collection every N frames
+
+# GUI settings
+GUI_UPDATE_INTERVAL = 50  # milliseconds
+GUI_WINDOW_WIDTH = 1200
+GUI_WINDOW_HEIGHT = 800
+
+# Authentication timeout
+AUTH_TIMEOUT = 30  # seconds to complete both authentications
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Immutable snapshot of every tunable, built once at import time.
+
+    Freezing prevents accidental runtime mutation of configuration, and a
+    single construction point means environment overrides are evaluated in
+    exactly one place instead of ad-hoc os.environ lookups per constant.
+    """
+
+    # Database
+    database_path: Path = DATABASE_PATH
+    logs_database_path: Path = LOGS_DATABASE_PATH
+    sqlite_journal_mode: str = SQLITE_JOURNAL_MODE
+    sqlite_synchronous: str = SQLITE_SYNCHRONOUS
+    sqlite_busy_timeout: int = SQLITE_BUSY_TIMEOUT
+    sqlite_cache_size: int = SQLITE_CACHE_SIZE
+    sqlite_temp_store: str = SQLITE_TEMP_STORE
+    sqlite_mmap_size: int = SQLITE_MMAP_SIZE
+    sqlite_logs_synchronous: str = SQLITE_LOGS_SYNCHRONOUS
+
+    # Camera
+    camera_index: int = CAMERA_INDEX
+    camera_width: int = CAMERA_WIDTH
+    camera_height: int = CAMERA_HEIGHT
+    camera_fps: int = CAMERA_FPS
+    camera_buffer_size: int = CAMERA_BUFFER_SIZE
+    camera_frame_timeout: int = CAMERA_FRAME_TIMEOUT
+    camera_retry_attempts: int = CAMERA_RETRY_ATTEMPTS
+
+    # Face recognition
+    face_recognition_tolerance: float = FACE_RECOGNITION_TOLERANCE
+    face_detection_model: str = FACE_DETECTION_MODEL
+    face_encoding_jitters: int = FACE_ENCODING_JITTERS
+    max_face_samples: int = MAX_FACE_SAMPLES
+    min_face_samples: int = MIN_FACE_SAMPLES
+    face_sample_target_std: float = FACE_SAMPLE_TARGET_STD
+    confidence_threshold: float = CONFIDENCE_THRESHOLD
+
+    # Fingerprint sensor
+    fingerprint_port: str = FINGERPRINT_PORT
+    fingerprint_baud_rate: int = FINGERPRINT_BAUD_RATE
+    fingerprint_timeout: int = FINGERPRINT_TIMEOUT
+    sensor_retry_attempts: int = SENSOR_RETRY_ATTEMPTS
+    sensor_retry_delay: int = SENSOR_RETRY_DELAY
+    sensor_connection_timeout: int = SENSOR_CONNECTION_TIMEOUT
+
+    # Door control
+    door_unlock_duration: int = DOOR_UNLOCK_DURATION
+    door_relay_pin: int = DOOR_RELAY_PIN
+    door_state_check_interval: int = DOOR_STATE_CHECK_INTERVAL
+    door_emergency_timeout: int = DOOR_EMERGENCY_TIMEOUT
+    door_retry_attempts: int = DOOR_RETRY_ATTEMPTS
+
+    # Web server and API
+    web_host: str = WEB_HOST
+    web_port: int = WEB_PORT
+    secret_key: str = SECRET_KEY
+    api_base_url: str = API_BASE_URL
+    rate_limit_requests: int = RATE_LIMIT_REQUESTS
+    rate_limit_window: int = RATE_LIMIT_WINDOW
+
+    # Logging
+    log_dir: Path = LOG_DIR
+    log_file: Path = LOG_FILE
+    log_level: str = LOG_LEVEL
+
+    # Enrollment
+    enrollment_dir: Path = ENROLLMENT_DIR
+
+    # Security
+    bcrypt_cost: int = BCRYPT_COST
+    password_min_length: int = PASSWORD_MIN_LENGTH
+    max_login_attempts: int = MAX_LOGIN_ATTEMPTS
+    lockout_duration: int = LOCKOUT_DURATION
+
+    # Authentication
+    auth_retry_attempts: int = AUTH_RETRY_ATTEMPTS
+    auth_retry_delay: int = AUTH_RETRY_DELAY
+    auth_timeout: int = AUTH_TIMEOUT
+
+    # Threading and memory
+    thread_timeout: int = THREAD_TIMEOUT
+    max_concurrent_threads: int = MAX_CONCURRENT_THREADS
+    max_frame_history: int = MAX_FRAME_HISTORY
+    gc_threshold: int = GC_THRESHOLD
+
+    # GUI
+    gui_update_interval: int = GUI_UPDATE_INTERVAL
+    gui_window_width: int = GUI_WINDOW_WIDTH
+    gui_window_height: int = GUI_WINDOW_HEIGHT
+
+
+def _env_overlay() -> Dict[str, Any]:
+    """Collect SMARTDOOR_* environment overrides, coerced to each default's type."""
+    overrides = {}
+    for field in fields(Settings):
+        raw = os.environ.get(f"SMARTDOOR_{field.name.upper()}")
+        if raw is None:
+            continue
+        default = field.default
+        if isinstance(default, bool):
+            overrides[field.name] = raw.lower() in ('1', 'true', 'yes', 'on')
+        elif isinstance(default, int):
+            overrides[field.name] = int(raw)
+        elif isinstance(default, float):
+            overrides[field.name] = float(raw)
+        elif isinstance(default, Path):
+            overrides[field.name] = Path(raw)
+        else:
+            overrides[field.name] = raw
+
+    # Recompute derived values unless they were overridden themselves
+    if ('web_host' in overrides or 'web_port' in overrides) and 'api_base_url' not in overrides:
+        host = overrides.get('web_host', WEB_HOST)
+        port = overrides.get('web_port', WEB_PORT)
+        overrides['api_base_url'] = f"http://{host}:{port}/api"
+    if 'log_dir' in overrides and 'log_file' not in overrides:
+        overrides['log_file'] = overrides['log_dir'] / "system.log"
+
+    return overrides
+
+
+CONFIG = Settings(**_env_overlay())
+
+# Keep the legacy UPPER_CASE constants in step with CONFIG so existing
+# `from config.settings import X` call sites see environment overrides too.
+for _field in fields(Settings):
+    globals()[_field.name.upper()] = getattr(CONFIG, _field.name)
+del _field
+
+__all__ = ['Settings', 'CONFIG']
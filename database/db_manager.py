@@ -1,568 +1,1094 @@
-"""
-Smart Door Security System - Database Manager
-Handles all database operations with connection pooling and thread safety.
-"""
-
-import sqlite3
-import threading
-import hashlib
-import pickle
-from datetime import datetime, date, time
-from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
-import logging
-import sys
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from config.settings import DATABASE_PATH
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-
-class DatabaseManager:
-    """Thread-safe database manager with connection pooling."""
-    
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls):
-        """Singleton pattern for database manager."""
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
-    
-    def __init__(self):
-        """Initialize the database manager."""
-        if self._initialized:
-            return
-        
-        self._local = threading.local()
-        self.db_path = DATABASE_PATH
-        self._initialized = True
-        self._init_database()
-    
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get thread-local database connection."""
-        if not hasattr(self._local, 'connection') or self._local.connection is None:
-            self._local.connection = sqlite3.connect(
-                str(self.db_path),
-                check_same_thread=False,
-                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
-            )
-            self._local.connection.row_factory = sqlite3.Row
-            self._local.connection.execute("PRAGMA foreign_keys = ON")
-        return self._local.connection
-    
-    def _init_database(self):
-        """Initialize database with schema."""
-        # Ensure database directory exists
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Read and execute schema
-        schema_path = Path(__file__).parent / "schema.sql"
-        if schema_path.exists():
-            with open(schema_path, 'r') as f:
-                schema = f.read()
-            
-            conn = self._get_connection()
-            conn.executescript(schema)
-            conn.commit()
-            logger.info("Database initialized successfully")
-        else:
-            logger.error(f"Schema file not found: {schema_path}")
-    
-    def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
-        """Execute a query and return cursor."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        return cursor
-    
-    def execute_many(self, query: str, params_list: List[tuple]) -> None:
-        """Execute a query with multiple parameter sets."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.executemany(query, params_list)
-        conn.commit()
-    
-    def commit(self):
-        """Commit current transaction."""
-        conn = self._get_connection()
-        conn.commit()
-    
-    def rollback(self):
-        """Rollback current transaction."""
-        conn = self._get_connection()
-        conn.rollback()
-    
-    def close(self):
-        """Close thread-local connection."""
-        if hasattr(self._local, 'connection') and self._local.connection:
-            self._local.connection.close()
-            self._local.connection = None
-
-
-class AdminRepository:
-    """Repository for admin-related database operations."""
-    
-    def __init__(self):
-        self.db = DatabaseManager()
-    
-    def get_by_username(self, username: str) -> Optional[Dict]:
-        """Get admin by username."""
-        cursor = self.db.execute(
-            "SELECT * FROM admin WHERE username = ?",
-            (username,)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    def get_by_id(self, admin_id: int) -> Optional[Dict]:
-        """Get admin by ID."""
-        cursor = self.db.execute(
-            "SELECT * FROM admin WHERE id = ?",
-            (admin_id,)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    # Lockout functionality removed - login attempts no longer tracked
-    
-    def update_last_login(self, admin_id: int):
-        """Update last login timestamp."""
-        self.db.execute(
-            "UPDATE admin SET last_login = ?, updated_at = ? WHERE id = ?",
-            (datetime.now(), datetime.now(), admin_id)
-        )
-        self.db.commit()
-    
-    def create_session(self, admin_id: int, token: str, expires_at: datetime, 
-                       ip_address: str = None, user_agent: str = None) -> int:
-        """Create a new admin session."""
-        cursor = self.db.execute(
-            """INSERT INTO admin_sessions (admin_id, session_token, ip_address, user_agent, expires_at)
-               VALUES (?, ?, ?, ?, ?)""",
-            (admin_id, token, ip_address, user_agent, expires_at)
-        )
-        self.db.commit()
-        return cursor.lastrowid
-    
-    def get_session(self, token: str) -> Optional[Dict]:
-        """Get session by token."""
-        cursor = self.db.execute(
-            """SELECT s.*, a.username, a.full_name 
-               FROM admin_sessions s
-               JOIN admin a ON s.admin_id = a.id
-               WHERE s.session_token = ? AND s.expires_at > ?""",
-            (token, datetime.now())
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    def delete_session(self, token: str):
-        """Delete a session."""
-        self.db.execute("DELETE FROM admin_sessions WHERE session_token = ?", (token,))
-        self.db.commit()
-
-
-class UserRepository:
-    """Repository for user-related database operations."""
-    
-    def __init__(self):
-        self.db = DatabaseManager()
-    
-    def create(self, employee_id: str, first_name: str, last_name: str,
-               email: str = None, phone: str = None, department: str = None,
-               designation: str = None, created_by: int = None) -> int:
-        """Create a new user."""
-        cursor = self.db.execute(
-            """INSERT INTO users (employee_id, first_name, last_name, email, phone, 
-                                  department, designation, created_by)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (employee_id, first_name, last_name, email, phone, department, designation, created_by)
-        )
-        self.db.commit()
-        return cursor.lastrowid
-    
-    def get_by_id(self, user_id: int) -> Optional[Dict]:
-        """Get user by ID."""
-        cursor = self.db.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    def get_by_employee_id(self, employee_id: str) -> Optional[Dict]:
-        """Get user by employee ID."""
-        cursor = self.db.execute(
-            "SELECT * FROM users WHERE employee_id = ?",
-            (employee_id,)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    def get_all(self, active_only: bool = False) -> List[Dict]:
-        """Get all users."""
-        query = "SELECT * FROM users"
-        if active_only:
-            query += " WHERE is_active = 1"
-        query += " ORDER BY first_name, last_name"
-        
-        cursor = self.db.execute(query)
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def get_active_enrolled_users(self) -> List[Dict]:
-        """Get all active users with both face and fingerprint enrolled."""
-        cursor = self.db.execute(
-            """SELECT * FROM users 
-               WHERE is_active = 1 AND face_enrolled = 1 AND fingerprint_enrolled = 1"""
-        )
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def update(self, user_id: int, **kwargs) -> bool:
-        """Update user fields."""
-        if not kwargs:
-            return False
-        
-        allowed_fields = ['first_name', 'last_name', 'email', 'phone', 
-                          'department', 'designation', 'is_active',
-                          'face_enrolled', 'fingerprint_enrolled']
-        
-        updates = []
-        values = []
-        for key, value in kwargs.items():
-            if key in allowed_fields:
-                updates.append(f"{key} = ?")
-                values.append(value)
-        
-        if not updates:
-            return False
-        
-        updates.append("updated_at = ?")
-        values.append(datetime.now())
-        values.append(user_id)
-        
-        query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
-        self.db.execute(query, tuple(values))
-        self.db.commit()
-        return True
-    
-    def delete(self, user_id: int) -> bool:
-        """Delete a user (cascades to face and fingerprint data)."""
-        self.db.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        self.db.commit()
-        return True
-    
-    def set_active(self, user_id: int, is_active: bool) -> bool:
-        """Enable or disable a user."""
-        return self.update(user_id, is_active=is_active)
-
-
-class FaceEncodingRepository:
-    """Repository for face encoding operations."""
-    
-    def __init__(self):
-        self.db = DatabaseManager()
-    
-    def save_encoding(self, user_id: int, encoding_array, num_samples: int = 1,
-                      quality_score: float = 0.0) -> int:
-        """Save face encoding for a user."""
-        # Serialize numpy array
-        encoding_bytes = pickle.dumps(encoding_array)
-        encoding_hash = hashlib.sha256(encoding_bytes).hexdigest()
-        
-        # Check if encoding exists
-        cursor = self.db.execute(
-            "SELECT id FROM face_encodings WHERE user_id = ?",
-            (user_id,)
-        )
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update existing
-            self.db.execute(
-                """UPDATE face_encodings 
-                   SET encoding_data = ?, encoding_hash = ?, num_samples = ?, 
-                       quality_score = ?, updated_at = ?
-                   WHERE user_id = ?""",
-                (encoding_bytes, encoding_hash, num_samples, quality_score, 
-                 datetime.now(), user_id)
-            )
-            result_id = existing[0]
-        else:
-            # Insert new
-            cursor = self.db.execute(
-                """INSERT INTO face_encodings (user_id, encoding_data, encoding_hash, 
-                                               num_samples, quality_score)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (user_id, encoding_bytes, encoding_hash, num_samples, quality_score)
-            )
-            result_id = cursor.lastrowid
-        
-        # Update user's face_enrolled status
-        self.db.execute(
-            "UPDATE users SET face_enrolled = 1, updated_at = ? WHERE id = ?",
-            (datetime.now(), user_id)
-        )
-        self.db.commit()
-        return result_id
-    
-    def get_encoding(self, user_id: int) -> Optional[Any]:
-        """Get face encoding for a user."""
-        cursor = self.db.execute(
-            "SELECT encoding_data FROM face_encodings WHERE user_id = ?",
-            (user_id,)
-        )
-        row = cursor.fetchone()
-        if row:
-            return pickle.loads(row[0])
-        return None
-    
-    def get_all_encodings(self) -> List[Dict]:
-        """Get all face encodings with user IDs."""
-        cursor = self.db.execute(
-            """SELECT fe.user_id, fe.encoding_data, u.first_name, u.last_name, u.employee_id
-               FROM face_encodings fe
-               JOIN users u ON fe.user_id = u.id
-               WHERE u.is_active = 1"""
-        )
-        results = []
-        for row in cursor.fetchall():
-            encoding = pickle.loads(row[1])
-            results.append({
-                'user_id': row[0],
-                'encoding': encoding,
-                'name': f"{row[2]} {row[3]}",
-                'employee_id': row[4]
-            })
-        return results
-    
-    def delete_encoding(self, user_id: int) -> bool:
-        """Delete face encoding for a user."""
-        self.db.execute("DELETE FROM face_encodings WHERE user_id = ?", (user_id,))
-        self.db.execute(
-            "UPDATE users SET face_enrolled = 0, updated_at = ? WHERE id = ?",
-            (datetime.now(), user_id)
-        )
-        self.db.commit()
-        return True
-
-
-class FingerprintRepository:
-    """Repository for fingerprint data operations."""
-    
-    def __init__(self):
-        self.db = DatabaseManager()
-    
-    def save_fingerprint(self, user_id: int, fingerprint_id: int,
-                         template_hash: str, finger_position: str = 'right_index') -> int:
-        """Save fingerprint data for a user."""
-        # Check if exists
-        cursor = self.db.execute(
-            "SELECT id FROM fingerprint_data WHERE user_id = ?",
-            (user_id,)
-        )
-        existing = cursor.fetchone()
-        
-        if existing:
-            self.db.execute(
-                """UPDATE fingerprint_data 
-                   SET fingerprint_id = ?, template_hash = ?, finger_position = ?, updated_at = ?
-                   WHERE user_id = ?""",
-                (fingerprint_id, template_hash, finger_position, datetime.now(), user_id)
-            )
-            result_id = existing[0]
-        else:
-            cursor = self.db.execute(
-                """INSERT INTO fingerprint_data (user_id, fingerprint_id, template_hash, finger_position)
-                   VALUES (?, ?, ?, ?)""",
-                (user_id, fingerprint_id, template_hash, finger_position)
-            )
-            result_id = cursor.lastrowid
-        
-        # Update user's fingerprint_enrolled status
-        self.db.execute(
-            "UPDATE users SET fingerprint_enrolled = 1, updated_at = ? WHERE id = ?",
-            (datetime.now(), user_id)
-        )
-        self.db.commit()
-        return result_id
-    
-    def get_by_fingerprint_id(self, fingerprint_id: int) -> Optional[Dict]:
-        """Get user by fingerprint sensor ID."""
-        cursor = self.db.execute(
-            """SELECT fd.*, u.first_name, u.last_name, u.employee_id, u.is_active
-               FROM fingerprint_data fd
-               JOIN users u ON fd.user_id = u.id
-               WHERE fd.fingerprint_id = ?""",
-            (fingerprint_id,)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    def get_by_user_id(self, user_id: int) -> Optional[Dict]:
-        """Get fingerprint data by user ID."""
-        cursor = self.db.execute(
-            "SELECT * FROM fingerprint_data WHERE user_id = ?",
-            (user_id,)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    def get_all_fingerprints(self) -> List[Dict]:
-        """Get all fingerprint mappings."""
-        cursor = self.db.execute(
-            """SELECT fd.fingerprint_id, fd.user_id, u.first_name, u.last_name, u.employee_id
-               FROM fingerprint_data fd
-               JOIN users u ON fd.user_id = u.id
-               WHERE u.is_active = 1"""
-        )
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def delete_fingerprint(self, user_id: int) -> bool:
-        """Delete fingerprint data for a user."""
-        self.db.execute("DELETE FROM fingerprint_data WHERE user_id = ?", (user_id,))
-        self.db.execute(
-            "UPDATE users SET fingerprint_enrolled = 0, updated_at = ? WHERE id = ?",
-            (datetime.now(), user_id)
-        )
-        self.db.commit()
-        return True
-
-
-class AccessLogRepository:
-    """Repository for access log operations."""
-    
-    def __init__(self):
-        self.db = DatabaseManager()
-    
-    def log_access(self, user_id: Optional[int], event_type: str, result: str,
-                   face_match: bool = False, fingerprint_match: bool = False,
-                   failure_reason: str = None, confidence_score: float = None,
-                   ip_address: str = None) -> int:
-        """Log an access attempt."""
-        now = datetime.now()
-        
-        # Get user info if available
-        employee_id = None
-        user_name = None
-        if user_id:
-            user_repo = UserRepository()
-            user = user_repo.get_by_id(user_id)
-            if user:
-                employee_id = user['employee_id']
-                user_name = f"{user['first_name']} {user['last_name']}"
-        
-        cursor = self.db.execute(
-            """INSERT INTO access_logs 
-               (user_id, employee_id, user_name, event_type, access_date, access_time,
-                result, face_match, fingerprint_match, failure_reason, confidence_score, ip_address)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (user_id, employee_id, user_name, event_type, now.date(), now.time(),
-             result, face_match, fingerprint_match, failure_reason, confidence_score, ip_address)
-        )
-        self.db.commit()
-        return cursor.lastrowid
-    
-    def get_logs(self, start_date: date = None, end_date: date = None,
-                 user_id: int = None, result: str = None, 
-                 limit: int = 100, offset: int = 0) -> List[Dict]:
-        """Get access logs with filters."""
-        query = "SELECT * FROM access_logs WHERE 1=1"
-        params = []
-        
-        if start_date:
-            query += " AND access_date >= ?"
-            params.append(start_date)
-        if end_date:
-            query += " AND access_date <= ?"
-            params.append(end_date)
-        if user_id:
-            query += " AND user_id = ?"
-            params.append(user_id)
-        if result:
-            query += " AND result = ?"
-            params.append(result)
-        
-        query += " ORDER BY access_date DESC, access_time DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-        
-        cursor = self.db.execute(query, tuple(params))
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def get_recent_logs(self, limit: int = 50) -> List[Dict]:
-        """Get most recent logs."""
-        cursor = self.db.execute(
-            """SELECT * FROM access_logs 
-               ORDER BY created_at DESC LIMIT ?""",
-            (limit,)
-        )
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def get_stats(self, days: int = 7) -> Dict:
-        """Get access statistics for the last N days."""
-        cursor = self.db.execute(
-            """SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN result = 'SUCCESS' THEN 1 ELSE 0 END) as successful,
-                SUM(CASE WHEN result = 'FAILED' THEN 1 ELSE 0 END) as failed,
-                SUM(CASE WHEN result = 'DENIED' THEN 1 ELSE 0 END) as denied
-               FROM access_logs
-               WHERE access_date >= date('now', ?)""",
-            (f'-{days} days',)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else {'total': 0, 'successful': 0, 'failed': 0, 'denied': 0}
-
-
-class SystemLogRepository:
-    """Repository for system log operations."""
-    
-    def __init__(self):
-        self.db = DatabaseManager()
-    
-    def log(self, level: str, module: str, message: str, details: str = None):
-        """Log a system event."""
-        self.db.execute(
-            "INSERT INTO system_logs (log_level, module, message, details) VALUES (?, ?, ?, ?)",
-            (level, module, message, details)
-        )
-        self.db.commit()
-    
-    def info(self, module: str, message: str, details: str = None):
-        self.log('INFO', module, message, details)
-    
-    def warning(self, module: str, message: str, details: str = None):
-        self.log('WARNING', module, message, details)
-    
-    def error(self, module: str, message: str, details: str = None):
-        self.log('ERROR', module, message, details)
-    
-    def get_logs(self, level: str = None, module: str = None, 
-                 limit: int = 100) -> List[Dict]:
-        """Get system logs with filters."""
-        query = "SELECT * FROM system_logs WHERE 1=1"
-        params = []
-        
-        if level:
-            query += " AND log_level = ?"
-            params.append(level)
-        if module:
-            query += " AND module = ?"
-            params.append(module)
-        
-        query += " ORDER BY created_at DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor = self.db.execute(query, tuple(params))
-        return [dict(row) for row in cursor.fetchall()]
-
-
-# Initialize database on import
-if __name__ == "__main__":
-    db = DatabaseManager()
-    print(f"Database initialized at: {DATABASE_PATH}")
+"""
+Smart Door Security System - Database Manager
+Handles all database operations with connection pooling and thread safety.
+"""
+
+import atexit
+import sqlite3
+import threading
+import pickle
+import queue
+from contextlib import contextmanager
+from datetime import datetime, date, time
+from functools import lru_cache
+from pathlib import Path
+from time import monotonic
+from typing import Optional, List, Dict, Any, Tuple
+import logging
+import sys
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import (
+    DATABASE_PATH, LOGS_DATABASE_PATH,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE, SQLITE_TEMP_STORE, SQLITE_MMAP_SIZE,
+    SQLITE_LOGS_SYNCHRONOUS
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump whenever schema.sql changes so _init_database re-runs the DDL.
+# Version 2: composite access_logs / fingerprint_data indexes.
+# Version 4: log/session tables moved to the attached logs database.
+# Version 5: face_encodings.encoding_hash dropped (UPSERT made dedup moot).
+# Version 6: admin_sessions table dropped (sessions are kept in process).
+SCHEMA_VERSION = 6
+
+
+class DatabaseManager:
+    """Thread-safe database manager with connection pooling.
+
+    A single shared instance (`_db`) is created at import time, so
+    constructing DatabaseManager() anywhere just returns it without any
+    locking on the instantiation path.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Return the shared instance created at import time."""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """Initialize the database manager."""
+        if self._initialized:
+            return
+
+        self._local = threading.local()
+        self.db_path = DATABASE_PATH
+        self.logs_path = LOGS_DATABASE_PATH
+        self._rw_connection: Optional[sqlite3.Connection] = None
+        self._rw_lock = threading.RLock()
+        self._in_transaction = False
+        self._initialized = True
+        self._init_database()
+        self.log_writer = _LogWriter(self)
+
+    def _get_rw_connection(self) -> sqlite3.Connection:
+        """Get the single shared read-write connection (serialized by _rw_lock)."""
+        with self._rw_lock:
+            if self._rw_connection is None:
+                self._rw_connection = sqlite3.connect(
+                    str(self.db_path),
+                    check_same_thread=False,
+                    detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                    isolation_level="IMMEDIATE",
+                    # sqlite3 keeps compiled statements in a per-connection
+                    # LRU keyed by SQL text, so every repeated query here is
+                    # effectively a prepared statement; 512 slots cover all
+                    # distinct statements in this codebase with room to spare
+                    cached_statements=512
+                )
+                self._rw_connection.row_factory = sqlite3.Row
+                self._apply_pragmas(self._rw_connection)
+                self._attach_logs(self._rw_connection)
+            return self._rw_connection
+
+    def _get_ro_connection(self) -> sqlite3.Connection:
+        """Get a thread-local read-only connection.
+
+        This thread-local scheme plus the single shared RW connection is
+        the connection pool: each thread opens its reader once and reuses
+        it for the life of the thread, so no request pays connect/pragma
+        setup. A sized external pool would only add checkout contention
+        for an embedded database.
+        """
+        if not hasattr(self._local, 'connection') or self._local.connection is None:
+            self._local.connection = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                cached_statements=512
+            )
+            self._local.connection.row_factory = sqlite3.Row
+            self._apply_pragmas(self._local.connection)
+            self._attach_logs(self._local.connection, readonly=True)
+            self._local.connection.execute("PRAGMA query_only = 1")
+        return self._local.connection
+
+    @staticmethod
+    def _apply_pragmas(conn: sqlite3.Connection):
+        """Apply performance pragmas once per connection."""
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT}")
+        conn.execute(f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}")
+        conn.execute(f"PRAGMA temp_store = {SQLITE_TEMP_STORE}")
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+
+    def _attach_logs(self, conn: sqlite3.Connection, readonly: bool = False):
+        """Attach the logs database; its WAL grows independently of main."""
+        if readonly:
+            conn.execute("ATTACH DATABASE ? AS logs",
+                         (f"file:{self.logs_path}?mode=ro",))
+        else:
+            conn.execute("ATTACH DATABASE ? AS logs", (str(self.logs_path),))
+            conn.execute(f"PRAGMA logs.journal_mode = {SQLITE_JOURNAL_MODE}")
+            # Losing the last instant of logs on a crash is acceptable, so
+            # log commits skip the fsync entirely
+            conn.execute(f"PRAGMA logs.synchronous = {SQLITE_LOGS_SYNCHRONOUS}")
+
+    def _init_database(self):
+        """Initialize database with schema (only when the schema version changed)."""
+        # Ensure database directory exists
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._rw_lock:
+            # The logs database must exist before any connection attaches
+            # it read-only; recreate it if the file has gone missing.
+            logs_missing = not self.logs_path.exists()
+            conn = self._get_rw_connection()
+            if logs_missing:
+                self._init_logs_schema()
+
+            # Warm startup: schema already at the current version, skip the
+            # DDL replay entirely (a single PRAGMA read).
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version == SCHEMA_VERSION:
+                return
+
+            schema_path = Path(__file__).parent / "schema.sql"
+            if not schema_path.exists():
+                logger.error(f"Schema file not found: {schema_path}")
+                return
+
+            with open(schema_path, 'r') as f:
+                schema = f.read()
+
+            if not logs_missing:
+                self._init_logs_schema()
+            conn.executescript(schema)
+            self._migrate_tables_to_logs(conn)
+            # v5: the hash only ever guarded against duplicate saves, which
+            # the UPSERT on user_id already prevents
+            columns = [row[1] for row in
+                       conn.execute("PRAGMA table_info(face_encodings)")]
+            if 'encoding_hash' in columns:
+                conn.execute("ALTER TABLE face_encodings DROP COLUMN encoding_hash")
+            # Integrity and planner-statistics passes only run on migration
+            conn.execute("PRAGMA foreign_key_check")
+            conn.execute("ANALYZE")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+            logger.info(f"Database initialized successfully (schema v{SCHEMA_VERSION})")
+
+    def _init_logs_schema(self):
+        """Create the logs database tables (idempotent)."""
+        schema_path = Path(__file__).parent / "logs_schema.sql"
+        with open(schema_path, 'r') as f:
+            logs_schema = f.read()
+        logs_conn = sqlite3.connect(str(self.logs_path))
+        try:
+            logs_conn.executescript(logs_schema)
+            logs_conn.commit()
+        finally:
+            logs_conn.close()
+
+    @staticmethod
+    def _migrate_tables_to_logs(conn: sqlite3.Connection):
+        """One-time move of log/session tables out of the main database."""
+        existing = {row[0] for row in conn.execute(
+            "SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+        for table in ('access_logs', 'system_logs'):
+            if table in existing:
+                conn.execute(f"INSERT INTO logs.{table} SELECT * FROM main.{table}")
+                conn.execute(f"DROP TABLE main.{table}")
+        if 'access_stats' in existing:
+            # Rebuilt by the stats trigger while access_logs rows were copied
+            conn.execute("DROP TABLE main.access_stats")
+        # Sessions are ephemeral and now live in process memory (v6); old
+        # rows are worthless after a restart anyway
+        conn.execute("DROP TABLE IF EXISTS main.admin_sessions")
+        conn.execute("DROP TABLE IF EXISTS logs.admin_sessions")
+        # Backfill daily rollups for rows that predate the stats trigger
+        conn.execute(
+            """INSERT INTO logs.access_stats (stat_date, total, successful, failed, denied)
+               SELECT access_date, COUNT(*),
+                      SUM(result = 'SUCCESS'), SUM(result = 'FAILED'), SUM(result = 'DENIED')
+               FROM logs.access_logs
+               WHERE NOT EXISTS (SELECT 1 FROM logs.access_stats)
+               GROUP BY access_date""")
+
+    def execute(self, query: str, params: tuple = (), write: bool = None) -> sqlite3.Cursor:
+        """
+        Execute a query and return cursor.
+
+        Writes go through the single shared RW connection; reads use a
+        thread-local read-only connection so they never block on the writer.
+        If `write` is not given it is inferred from the SQL verb.
+        """
+        if write is None:
+            write = not query.lstrip()[:6].upper().startswith(('SELECT', 'PRAGMA'))
+
+        if write:
+            with self._rw_lock:
+                cursor = self._get_rw_connection().cursor()
+                cursor.execute(query, params)
+                return cursor
+
+        cursor = self._get_ro_connection().cursor()
+        cursor.execute(query, params)
+        return cursor
+
+    def execute_many(self, query: str, params_list: List[tuple]) -> None:
+        """Execute a write query with multiple parameter sets."""
+        with self._rw_lock:
+            conn = self._get_rw_connection()
+            cursor = conn.cursor()
+            cursor.executemany(query, params_list)
+            conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several writes into one transaction (a single fsync).
+
+        The write connection runs with isolation_level="IMMEDIATE", so the
+        first statement inside the block takes the write lock via BEGIN
+        IMMEDIATE. Repository commit() calls made inside the block become
+        no-ops; the block commits once on exit and rolls back on error.
+        Nested blocks join the outermost transaction.
+        """
+        with self._rw_lock:
+            conn = self._get_rw_connection()
+            if self._in_transaction:
+                yield conn
+                return
+            self._in_transaction = True
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._in_transaction = False
+
+    def commit(self):
+        """Commit current write transaction (no-op inside a transaction() block)."""
+        with self._rw_lock:
+            if self._in_transaction:
+                return
+            self._get_rw_connection().commit()
+
+    def rollback(self):
+        """Rollback current write transaction."""
+        with self._rw_lock:
+            self._get_rw_connection().rollback()
+
+    def close(self):
+        """Close thread-local read connection and the shared write connection."""
+        self.log_writer.flush()
+        if hasattr(self._local, 'connection') and self._local.connection:
+            self._local.connection.close()
+            self._local.connection = None
+        with self._rw_lock:
+            if self._rw_connection:
+                self._rw_connection.close()
+                self._rw_connection = None
+
+
+class _LogWriter:
+    """
+    Background writer that batches access/system log inserts.
+
+    Door events and system messages are the highest-frequency writes in the
+    system; batching them into one transaction per drain collapses N fsyncs
+    into one and keeps logging off the caller's critical path.
+    """
+
+    FLUSH_INTERVAL = 0.1  # seconds to wait for more events before committing
+    MAX_BATCH = 64  # maximum events per transaction
+
+    _ACCESS_SQL = """INSERT INTO logs.access_logs
+               (user_id, employee_id, user_name, event_type, access_date, access_time,
+                result, face_match, fingerprint_match, failure_reason, confidence_score, ip_address)
+               VALUES (?, ?, ?, ?, date('now', 'localtime'), time('now', 'localtime'),
+                       ?, ?, ?, ?, ?, ?)"""
+    _SYSTEM_SQL = "INSERT INTO logs.system_logs (log_level, module, message, details) VALUES (?, ?, ?, ?)"
+
+    def __init__(self, db: 'DatabaseManager'):
+        self.db = db
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._drain_loop, daemon=True)
+        self._thread.start()
+        # The drain thread is a daemon, so flush whatever is still queued
+        # before the interpreter tears it down on a clean exit
+        atexit.register(self.flush, 2.0)
+
+    def enqueue_access(self, params: tuple):
+        """Queue an access_logs row for the next batch."""
+        self._queue.put(('access', params))
+
+    def enqueue_system(self, params: tuple):
+        """Queue a system_logs row for the next batch."""
+        self._queue.put(('system', params))
+
+    def flush(self, timeout: float = 5.0):
+        """Block until all currently queued events are committed."""
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        done.wait(timeout)
+
+    def _drain_loop(self):
+        """Collect events for up to FLUSH_INTERVAL, then commit them as one batch."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.MAX_BATCH:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Log writer batch failed: {e}")
+
+    def _write_batch(self, batch: List[tuple]):
+        """Write one batch of queued events in a single transaction."""
+        access_rows = [params for kind, params in batch if kind == 'access']
+        system_rows = [params for kind, params in batch if kind == 'system']
+        flush_events = [params for kind, params in batch if kind == 'flush']
+
+        if access_rows or system_rows:
+            with self.db._rw_lock:
+                conn = self.db._get_rw_connection()
+                cursor = conn.cursor()
+                if access_rows:
+                    cursor.executemany(self._ACCESS_SQL, access_rows)
+                if system_rows:
+                    cursor.executemany(self._SYSTEM_SQL, system_rows)
+                conn.commit()
+
+        for event in flush_events:
+            event.set()
+
+
+# Shared manager instance; repositories reference it as a class attribute so
+# instantiating a repository does no singleton bookkeeping at all.
+_db = DatabaseManager()
+
+
+@lru_cache(maxsize=256)
+def _user_display_info(user_id: int) -> Tuple[Optional[str], Optional[str]]:
+    """Cached (employee_id, full name) lookup for log denormalization."""
+    cursor = _db.execute(
+        "SELECT employee_id, first_name, last_name FROM users WHERE id = ?",
+        (user_id,)
+    )
+    row = cursor.fetchone()
+    if row:
+        return row[0], f"{row[1]} {row[2]}"
+    return None, None
+
+
+# Every authenticated page load re-reads the logged-in admin row in the
+# login_required decorator. Admin rows barely change, so memoize them on
+# the same short TTL bucket scheme as _cached_user; a disabled admin is
+# still locked out within ADMIN_CACHE_TTL seconds.
+ADMIN_CACHE_TTL = 5  # seconds
+
+
+@lru_cache(maxsize=32)
+def _cached_admin(admin_id: int, _bucket: int) -> Optional[Dict]:
+    cursor = _db.execute(
+        """SELECT id, username, email, full_name, is_active, last_login
+           FROM admin WHERE id = ?""",
+        (admin_id,)
+    )
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+class AdminRepository:
+    """Repository for admin-related database operations."""
+
+    # Admin sessions are ephemeral: a process restart just forces a
+    # re-login. Keeping them in a plain dict removes a WAL fsync from
+    # every login/logout and a disk read from every session check.
+    # Dict reads are atomic under the GIL, so lookups are lock-free;
+    # writers hold _sessions_lock.
+    _sessions: Dict[str, Dict] = {}
+    _sessions_lock = threading.Lock()
+    _session_counter = 0
+
+    db = _db
+    
+    def get_by_username(self, username: str) -> Optional[Dict]:
+        """Get admin by username."""
+        cursor = self.db.execute(
+            """SELECT id, username, password_hash, email, full_name,
+                      is_active, last_login
+               FROM admin WHERE username = ?""",
+            (username,)
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
+    def get_by_id(self, admin_id: int) -> Optional[Dict]:
+        """Get admin by ID (briefly memoized; treat the result as read-only)."""
+        return _cached_admin(admin_id, int(monotonic() // ADMIN_CACHE_TTL))
+    
+    # Lockout functionality removed - login attempts no longer tracked
+    
+    def update_last_login(self, admin_id: int):
+        """Update last login timestamp."""
+        self.db.execute(
+            "UPDATE admin SET last_login = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (admin_id,),
+            write=True
+        )
+        self.db.commit()
+        _cached_admin.cache_clear()
+    
+    def create_session(self, admin_id: int, token: str, expires_at: datetime,
+                       ip_address: str = None, user_agent: str = None) -> int:
+        """Create a new admin session (in process memory, no disk IO)."""
+        admin = self.get_by_id(admin_id)
+        with AdminRepository._sessions_lock:
+            AdminRepository._session_counter += 1
+            session_id = AdminRepository._session_counter
+            AdminRepository._sessions[token] = {
+                'id': session_id,
+                'admin_id': admin_id,
+                'session_token': token,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'expires_at': expires_at,
+                'created_at': datetime.now(),
+                'username': admin['username'] if admin else None,
+                'full_name': admin['full_name'] if admin else None,
+            }
+        return session_id
+
+    def get_session(self, token: str) -> Optional[Dict]:
+        """Get session by token (expired sessions are dropped lazily)."""
+        session = AdminRepository._sessions.get(token)
+        if session is None:
+            return None
+        if session['expires_at'] <= datetime.now():
+            self.delete_session(token)
+            return None
+        return dict(session)
+
+    def delete_session(self, token: str):
+        """Delete a session."""
+        with AdminRepository._sessions_lock:
+            AdminRepository._sessions.pop(token, None)
+
+
+# Explicit column lists for the hot read paths: SELECT * makes SQLite
+# materialize every column of each B-tree row, so enumerating just what
+# callers consume keeps result rows lean and stable under schema growth.
+_USER_COLUMNS = ("id, employee_id, first_name, last_name, email, phone, "
+                 "department, designation, is_active, face_enrolled, "
+                 "fingerprint_enrolled, created_at, updated_at")
+_ACCESS_LOG_COLUMNS = ("id, user_id, employee_id, user_name, event_type, "
+                       "access_date, access_time, result, face_match, "
+                       "fingerprint_match, failure_reason, confidence_score, "
+                       "ip_address, created_at")
+
+
+# Columns an admin may change through UserRepository.update; frozenset so
+# membership checks are O(1) and the whitelist is built once, not per call.
+_USER_ALLOWED_FIELDS = frozenset({
+    'first_name', 'last_name', 'email', 'phone',
+    'department', 'designation', 'is_active',
+    'face_enrolled', 'fingerprint_enrolled'
+})
+
+
+# Short-lived memo of user rows for the authentication hot path, which
+# re-reads the same user on every matched frame. Bucketed on monotonic
+# time like _cached_stats so cross-process changes (web dashboard
+# disabling a user) are honoured within USER_CACHE_TTL seconds.
+USER_CACHE_TTL = 2  # seconds
+
+
+@lru_cache(maxsize=256)
+def _cached_user(user_id: int, _bucket: int) -> Optional[Dict]:
+    cursor = _db.execute(
+        f"SELECT {_USER_COLUMNS} FROM users WHERE id = ?", (user_id,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+class UserRepository:
+    """Repository for user-related database operations."""
+
+    db = _db
+
+    def create(self, employee_id: str, first_name: str, last_name: str,
+               email: str = None, phone: str = None, department: str = None,
+               designation: str = None, created_by: int = None) -> int:
+        """Create a new user."""
+        cursor = self.db.execute(
+            """INSERT INTO users (employee_id, first_name, last_name, email, phone, 
+                                  department, designation, created_by)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (employee_id, first_name, last_name, email, phone, department, designation, created_by),
+            write=True
+        )
+        self.db.commit()
+        return cursor.lastrowid
+    
+    def get_by_id(self, user_id: int) -> Optional[Dict]:
+        """Get user by ID (briefly memoized; treat the result as read-only)."""
+        return _cached_user(user_id, int(monotonic() // USER_CACHE_TTL))
+    
+    def get_validation_view(self, user_id: int) -> Optional[Dict]:
+        """Narrow projection for the access-validation check.
+
+        Validation only decides yes/no and labels the log line, so it
+        reads seven columns instead of the full user row (which carries
+        contact and department fields the check never looks at). The
+        combined `valid` flag is computed in SQL so the common success
+        path needs no per-flag branching; the individual flags remain
+        separate columns — packing them into a bitfield would mean a
+        schema migration and flag arithmetic at every write site to save
+        two bytes per row.
+        """
+        cursor = self.db.execute(
+            """SELECT id, employee_id, first_name, last_name, is_active,
+                      face_enrolled, fingerprint_enrolled,
+                      (is_active AND face_enrolled AND fingerprint_enrolled)
+                          AS valid
+               FROM users WHERE id = ?""",
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def get_by_employee_id(self, employee_id: str) -> Optional[Dict]:
+        """Get user by employee ID."""
+        cursor = self.db.execute(
+            f"SELECT {_USER_COLUMNS} FROM users WHERE employee_id = ?",
+            (employee_id,)
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
+    def get_all(self, active_only: bool = False) -> List[Dict]:
+        """Get all users."""
+        query = f"SELECT {_USER_COLUMNS} FROM users"
+        if active_only:
+            query += " WHERE is_active = 1"
+        query += " ORDER BY first_name, last_name"
+        
+        cursor = self.db.execute(query)
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_active_enrolled_users(self) -> List[Dict]:
+        """Get all active users with both face and fingerprint enrolled."""
+        cursor = self.db.execute(
+            f"""SELECT {_USER_COLUMNS} FROM users
+               WHERE is_active = 1 AND face_enrolled = 1 AND fingerprint_enrolled = 1"""
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def count_users(self) -> Dict[str, int]:
+        """Count total and active users with one aggregate query."""
+        row = self.db.execute(
+            "SELECT COUNT(*) AS total, COALESCE(SUM(is_active), 0) AS active FROM users"
+        ).fetchone()
+        return {'total': row['total'], 'active': row['active']}
+
+    def update(self, user_id: int, **kwargs) -> bool:
+        """Update user fields."""
+        items = [(key, value) for key, value in kwargs.items()
+                 if key in _USER_ALLOWED_FIELDS]
+        if not items:
+            return False
+
+        sets = ', '.join(f"{key} = ?" for key, _ in items)
+        values = [value for _, value in items]
+        values.append(user_id)
+
+        query = f"UPDATE users SET {sets}, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+        cursor = self.db.execute(query, tuple(values), write=True)
+        self.db.commit()
+        _user_display_info.cache_clear()
+        _cached_user.cache_clear()
+        # rowcount doubles as the existence check, sparing callers a
+        # SELECT before every mutation
+        return cursor.rowcount > 0
+
+    def delete(self, user_id: int) -> bool:
+        """Delete a user (cascades to face and fingerprint data)."""
+        cursor = self.db.execute(
+            "DELETE FROM users WHERE id = ?", (user_id,), write=True)
+        self.db.commit()
+        _user_display_info.cache_clear()
+        _cached_user.cache_clear()
+        return cursor.rowcount > 0
+    
+    def set_active(self, user_id: int, is_active: bool) -> bool:
+        """Enable or disable a user."""
+        return self.update(user_id, is_active=is_active)
+
+
+# Face encodings are fixed 128-dimension vectors (dlib ResNet model);
+# stored as raw little-endian float32 bytes rather than pickle. float32
+# is the precision floor here: it halves float64 storage with no
+# measurable effect on match distances, while narrower (int8) encodings
+# would need per-vector scale calibration that the fixed Euclidean
+# tolerance is not set up for — not worth it below many thousands of
+# enrolled users.
+FACE_ENCODING_DIM = 128
+FACE_ENCODING_DTYPE = np.float32
+
+
+def _decode_face_encoding(blob: bytes) -> np.ndarray:
+    """Decode a stored face encoding, accepting legacy pickled rows."""
+    if len(blob) == FACE_ENCODING_DIM * FACE_ENCODING_DTYPE().itemsize:
+        return np.frombuffer(blob, dtype=FACE_ENCODING_DTYPE)
+    # Legacy rows were pickled float64 arrays; re-saving migrates them.
+    return pickle.loads(blob)
+
+
+class FaceEncodingRepository:
+    """Repository for face encoding operations."""
+
+    # Process-wide cache of get_all_encodings(), rebuilt only after a
+    # save/delete; recognition reads this every frame. The data_version
+    # pragma stamps the cache so enrollments made from another process
+    # (e.g. the CLI while the GUI is running) are also picked up.
+    _cache: Optional[Dict[str, Any]] = None
+    _cache_data_version: Optional[int] = None
+    _cache_lock = threading.Lock()
+
+    db = _db
+
+    @classmethod
+    def _invalidate_cache(cls):
+        """Drop the cached encoding list after a mutation."""
+        with cls._cache_lock:
+            cls._cache = None
+
+    def save_encoding(self, user_id: int, encoding_array, num_samples: int = 1,
+                      quality_score: float = 0.0) -> int:
+        """Save face encoding for a user."""
+        # Serialize numpy array as raw float32 bytes (512 B vs ~1 KB pickled)
+        encoding_bytes = np.asarray(
+            encoding_array, dtype=FACE_ENCODING_DTYPE
+        ).tobytes()
+
+        # Single UPSERT instead of SELECT-then-UPDATE/INSERT
+        self.db.execute(
+            """INSERT INTO face_encodings (user_id, encoding_data,
+                                           num_samples, quality_score)
+               VALUES (?, ?, ?, ?)
+               ON CONFLICT(user_id) DO UPDATE SET
+                   encoding_data = excluded.encoding_data,
+                   num_samples = excluded.num_samples,
+                   quality_score = excluded.quality_score,
+                   updated_at = CURRENT_TIMESTAMP""",
+            (user_id, encoding_bytes, num_samples, quality_score),
+            write=True
+        )
+
+        # Update user's face_enrolled status
+        self.db.execute(
+            "UPDATE users SET face_enrolled = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (user_id,),
+            write=True
+        )
+        self.db.commit()
+        self._invalidate_cache()
+
+        # Read back on the write connection so the id is visible even when
+        # this save is part of an enclosing transaction() block
+        cursor = self.db.execute(
+            "SELECT id FROM face_encodings WHERE user_id = ?",
+            (user_id,),
+            write=True
+        )
+        return cursor.fetchone()[0]
+    
+    def get_encoding(self, user_id: int) -> Optional[Any]:
+        """Get face encoding for a user."""
+        cursor = self.db.execute(
+            "SELECT encoding_data FROM face_encodings WHERE user_id = ?",
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        if row:
+            return _decode_face_encoding(row[0])
+        return None
+    
+    def get_all_encodings(self) -> Dict[str, Any]:
+        """
+        Get all known face encodings (cached until the database changes).
+
+        Returns a dict with a single (N, 128) float32 'matrix' plus parallel
+        'user_ids' (int64 array), 'names' and 'employee_ids' lists, so
+        recognition can score a probe against everyone with one vectorized
+        distance computation instead of a per-user Python loop.
+        """
+        # data_version increments whenever another connection commits to
+        # the file, making staleness detection a pragma read instead of a
+        # table scan; same-process writes invalidate explicitly
+        data_version = self.db.execute("PRAGMA data_version").fetchone()[0]
+        with self._cache_lock:
+            if (FaceEncodingRepository._cache is not None
+                    and FaceEncodingRepository._cache_data_version == data_version):
+                return FaceEncodingRepository._cache
+        cursor = self.db.execute(
+            """SELECT fe.user_id, fe.encoding_data, u.first_name, u.last_name, u.employee_id
+               FROM face_encodings fe
+               JOIN users u ON fe.user_id = u.id
+               WHERE u.is_active = 1"""
+        )
+        rows = cursor.fetchall()
+        matrix = np.empty((len(rows), FACE_ENCODING_DIM), dtype=FACE_ENCODING_DTYPE)
+        user_ids = np.empty(len(rows), dtype=np.int64)
+        names = []
+        employee_ids = []
+        for i, row in enumerate(rows):
+            matrix[i] = _decode_face_encoding(row[1])
+            user_ids[i] = row[0]
+            names.append(f"{row[2]} {row[3]}")
+            employee_ids.append(row[4])
+        results = {
+            'matrix': matrix,
+            'user_ids': user_ids,
+            'names': names,
+            'employee_ids': employee_ids
+        }
+        with self._cache_lock:
+            FaceEncodingRepository._cache = results
+            FaceEncodingRepository._cache_data_version = data_version
+        return results
+    
+    def delete_encoding(self, user_id: int) -> bool:
+        """Delete face encoding for a user."""
+        self.db.execute("DELETE FROM face_encodings WHERE user_id = ?", (user_id,), write=True)
+        self.db.execute(
+            "UPDATE users SET face_enrolled = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (user_id,),
+            write=True
+        )
+        self.db.commit()
+        self._invalidate_cache()
+        return True
+
+
+# The fingerprint-slot -> user mapping changes only on enroll/delete, yet
+# the continuous scan loop re-reads it on every match. Entries are bucketed
+# on a short TTL like _cached_user so an is_active flip from the web
+# dashboard is still honoured within seconds.
+FINGERPRINT_CACHE_TTL = 2  # seconds
+
+
+@lru_cache(maxsize=256)
+def _cached_fingerprint_user(fingerprint_id: int, _bucket: int) -> Optional[Dict]:
+    cursor = _db.execute(
+        """SELECT fd.id, fd.user_id, fd.fingerprint_id, fd.template_hash,
+                  fd.finger_position, u.first_name, u.last_name, u.employee_id, u.is_active
+           FROM fingerprint_data fd
+           JOIN users u ON fd.user_id = u.id
+           WHERE fd.fingerprint_id = ?""",
+        (fingerprint_id,)
+    )
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+class FingerprintRepository:
+    """Repository for fingerprint data operations."""
+
+    db = _db
+
+    def save_fingerprint(self, user_id: int, fingerprint_id: int,
+                         template_hash: str, finger_position: str = 'right_index') -> int:
+        """Save fingerprint data for a user."""
+        # Single UPSERT instead of SELECT-then-UPDATE/INSERT
+        self.db.execute(
+            """INSERT INTO fingerprint_data (user_id, fingerprint_id, template_hash, finger_position)
+               VALUES (?, ?, ?, ?)
+               ON CONFLICT(user_id) DO UPDATE SET
+                   fingerprint_id = excluded.fingerprint_id,
+                   template_hash = excluded.template_hash,
+                   finger_position = excluded.finger_position,
+                   updated_at = CURRENT_TIMESTAMP""",
+            (user_id, fingerprint_id, template_hash, finger_position),
+            write=True
+        )
+
+        # Update user's fingerprint_enrolled status
+        self.db.execute(
+            "UPDATE users SET fingerprint_enrolled = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (user_id,),
+            write=True
+        )
+        self.db.commit()
+        _cached_fingerprint_user.cache_clear()
+
+        cursor = self.db.execute(
+            "SELECT id FROM fingerprint_data WHERE user_id = ?",
+            (user_id,),
+            write=True
+        )
+        return cursor.fetchone()[0]
+    
+    def save_fingerprints_bulk(self, records: List[Dict], batch_size: int = 2000) -> int:
+        """Save many fingerprint mappings in batched transactions.
+
+        For migrations and bulk re-enrollment, where calling
+        save_fingerprint per record would pay a commit (and its fsync)
+        each time; here every batch_size records share one commit. Each
+        record needs user_id, fingerprint_id and template_hash, with
+        finger_position optional. Returns the number of records written.
+        """
+        total = 0
+        for start in range(0, len(records), batch_size):
+            chunk = records[start:start + batch_size]
+            with self.db.transaction() as conn:
+                conn.executemany(
+                    """INSERT INTO fingerprint_data (user_id, fingerprint_id, template_hash, finger_position)
+                       VALUES (?, ?, ?, ?)
+                       ON CONFLICT(user_id) DO UPDATE SET
+                           fingerprint_id = excluded.fingerprint_id,
+                           template_hash = excluded.template_hash,
+                           finger_position = excluded.finger_position,
+                           updated_at = CURRENT_TIMESTAMP""",
+                    [(r['user_id'], r['fingerprint_id'], r['template_hash'],
+                      r.get('finger_position', 'right_index')) for r in chunk]
+                )
+                conn.executemany(
+                    "UPDATE users SET fingerprint_enrolled = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    [(r['user_id'],) for r in chunk]
+                )
+            total += len(chunk)
+
+        _cached_fingerprint_user.cache_clear()
+        return total
+
+    def get_by_fingerprint_id(self, fingerprint_id: int) -> Optional[Dict]:
+        """Get user by fingerprint sensor ID (briefly memoized; treat the result as read-only)."""
+        return _cached_fingerprint_user(
+            fingerprint_id, int(monotonic() // FINGERPRINT_CACHE_TTL))
+    
+    def get_by_user_id(self, user_id: int) -> Optional[Dict]:
+        """Get fingerprint data by user ID."""
+        cursor = self.db.execute(
+            """SELECT id, user_id, fingerprint_id, template_hash, finger_position
+               FROM fingerprint_data WHERE user_id = ?""",
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
+    def get_used_fingerprint_ids(self) -> List[int]:
+        """Get all sensor slot IDs in use, sorted ascending.
+
+        Unlike get_all_fingerprints this does not filter on user activity:
+        a deactivated user's template still occupies its sensor slot.
+        """
+        cursor = self.db.execute(
+            "SELECT fingerprint_id FROM fingerprint_data ORDER BY fingerprint_id"
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_all_fingerprints(self) -> List[Dict]:
+        """Get all fingerprint mappings."""
+        cursor = self.db.execute(
+            """SELECT fd.fingerprint_id, fd.user_id, u.first_name, u.last_name, u.employee_id
+               FROM fingerprint_data fd
+               JOIN users u ON fd.user_id = u.id
+               WHERE u.is_active = 1"""
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def delete_fingerprint(self, user_id: int) -> bool:
+        """Delete fingerprint data for a user."""
+        self.db.execute("DELETE FROM fingerprint_data WHERE user_id = ?", (user_id,), write=True)
+        self.db.execute(
+            "UPDATE users SET fingerprint_enrolled = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (user_id,),
+            write=True
+        )
+        self.db.commit()
+        _cached_fingerprint_user.cache_clear()
+        return True
+
+
+class AccessLogRepository:
+    """Repository for access log operations."""
+
+    db = _db
+    
+    def log_access(self, user_id: Optional[int], event_type: str, result: str,
+                   face_match: bool = False, fingerprint_match: bool = False,
+                   failure_reason: str = None, confidence_score: float = None,
+                   ip_address: str = None, employee_id: str = None,
+                   user_name: str = None) -> None:
+        """
+        Queue an access attempt for the background log writer.
+
+        Callers that just authenticated the user can pass employee_id and
+        user_name directly to skip the lookup entirely.
+        """
+        # Resolve user info only when the caller didn't supply it (cached)
+        if user_id and (employee_id is None or user_name is None):
+            employee_id, user_name = _user_display_info(user_id)
+
+        self.db.log_writer.enqueue_access(
+            (user_id, employee_id, user_name, event_type,
+             result, face_match, fingerprint_match, failure_reason, confidence_score, ip_address)
+        )
+    
+    def get_logs(self, start_date: date = None, end_date: date = None,
+                 user_id: int = None, result: str = None,
+                 limit: int = 100, offset: int = 0,
+                 before: Tuple = None) -> List[Dict]:
+        """
+        Get access logs with filters.
+
+        Prefer keyset pagination: pass `before` as the
+        (access_date, access_time, id) of the last row on the previous page
+        to get the next page as a pure index range scan. The OFFSET path is
+        kept for callers that still page by number, but it re-scans and
+        discards `offset` rows each call.
+        """
+        query = f"SELECT {_ACCESS_LOG_COLUMNS} FROM logs.access_logs WHERE 1=1"
+        params = []
+
+        if start_date:
+            query += " AND access_date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND access_date <= ?"
+            params.append(end_date)
+        if user_id:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        if result:
+            query += " AND result = ?"
+            params.append(result)
+
+        if before is not None:
+            query += " AND (access_date, access_time, id) < (?, ?, ?)"
+            params.extend(before)
+            query += " ORDER BY access_date DESC, access_time DESC, id DESC LIMIT ?"
+            params.append(limit)
+        else:
+            query += " ORDER BY access_date DESC, access_time DESC, id DESC LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+
+        cursor = self.db.execute(query, tuple(params))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_recent_logs(self, limit: int = 50) -> List[Dict]:
+        """Get most recent logs."""
+        cursor = self.db.execute(
+            f"""SELECT {_ACCESS_LOG_COLUMNS} FROM logs.access_logs
+               ORDER BY created_at DESC LIMIT ?""",
+            (limit,)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_dashboard_bundle(self, days: int = 7, recent_limit: int = 10) -> Dict:
+        """
+        Gather everything the dashboard renders in one call.
+
+        SQLite runs in-process, so there is no per-query wire latency to
+        collapse as there would be on a networked database; the value here
+        is that the three reads share one already-open connection (and the
+        stats memo) and the view makes a single repository call.
+        """
+        return {
+            'stats': self.get_stats(days=days),
+            'recent_logs': self.get_recent_logs(limit=recent_limit),
+            'user_counts': UserRepository().count_users(),
+        }
+
+    # Dashboards poll stats every few seconds; identical answers within a
+    # short window are served from memory instead of hitting the database.
+    STATS_TTL = 5  # seconds
+
+    def get_stats(self, days: int = 7) -> Dict:
+        """Get access statistics for the last N days (briefly memoized)."""
+        total, successful, failed, denied = _cached_stats(
+            days, int(monotonic() // self.STATS_TTL))
+        return {'total': total, 'successful': successful,
+                'failed': failed, 'denied': denied}
+
+
+@lru_cache(maxsize=32)
+def _cached_stats(days: int, _bucket: int) -> Tuple[int, int, int, int]:
+    """
+    Sum the trigger-maintained access_stats daily rollups for the last N
+    days. _bucket changes every STATS_TTL seconds, so repeated dashboard
+    polls within a bucket reuse the cached tuple.
+    """
+    row = _db.execute(
+        """SELECT
+            COALESCE(SUM(total), 0) as total,
+            COALESCE(SUM(successful), 0) as successful,
+            COALESCE(SUM(failed), 0) as failed,
+            COALESCE(SUM(denied), 0) as denied
+           FROM logs.access_stats
+           WHERE stat_date >= date('now', ?)""",
+        (f'-{days} days',)
+    ).fetchone()
+    return (row['total'], row['successful'], row['failed'], row['denied'])
+
+
+class SystemLogRepository:
+    """Repository for system log operations."""
+
+    db = _db
+    
+    def log(self, level: str, module: str, message: str, details: str = None):
+        """Queue a system event for the background log writer."""
+        self.db.log_writer.enqueue_system((level, module, message, details))
+    
+    def info(self, module: str, message: str, details: str = None):
+        self.log('INFO', module, message, details)
+    
+    def warning(self, module: str, message: str, details: str = None):
+        self.log('WARNING', module, message, details)
+    
+    def error(self, module: str, message: str, details: str = None):
+        self.log('ERROR', module, message, details)
+    
+    def get_logs(self, level: str = None, module: str = None, 
+                 limit: int = 100) -> List[Dict]:
+        """Get system logs with filters."""
+        query = "SELECT id, log_level, module, message, details, created_at FROM logs.system_logs WHERE 1=1"
+        params = []
+        
+        if level:
+            query += " AND log_level = ?"
+            params.append(level)
+        if module:
+            query += " AND module = ?"
+            params.append(module)
+        
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        
+        cursor = self.db.execute(query, tuple(params))
+        return [dict(row) for row in cursor.fetchall()]
+
+
+# Initialize database on import
+if __name__ == "__main__":
+    db = DatabaseManager()
+    print(f"Database initialized at: {DATABASE_PATH}")
@@ -0,0 +1,74 @@
+-- Smart Door Security System - Logs Database Schema
+-- High-churn tables (access logs, system logs) live in a separate
+-- attached database file so their constant page churn and WAL growth
+-- never evict the users/face_encodings working set from the main
+-- database's page cache.
+--
+-- Note: foreign keys into the main database (users, admin) cannot be
+-- declared here because SQLite does not enforce constraints across
+-- attached databases; the referencing id columns are kept as plain values.
+
+-- Access logs table - records all entry/exit attempts
+CREATE TABLE IF NOT EXISTS access_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,  -- NULL if unknown person
+    employee_id VARCHAR(50),  -- Stored separately for historical reference
+    user_name VARCHAR(100),  -- Stored separately for historical reference
+    event_type VARCHAR(10) NOT NULL CHECK(event_type IN ('ENTRY', 'EXIT')),
+    access_date DATE NOT NULL,
+    access_time TIME NOT NULL,
+    result VARCHAR(20) NOT NULL CHECK(result IN ('SUCCESS', 'FAILED', 'DENIED')),
+    face_match BOOLEAN DEFAULT 0,
+    fingerprint_match BOOLEAN DEFAULT 0,
+    failure_reason VARCHAR(255),
+    confidence_score FLOAT,
+    ip_address VARCHAR(45),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Daily access statistics, maintained by trigger so dashboard stats are
+-- an indexed point-range over a tiny table instead of a full log scan
+CREATE TABLE IF NOT EXISTS access_stats (
+    stat_date DATE PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    successful INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    denied INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_access_logs_stats
+AFTER INSERT ON access_logs
+BEGIN
+    INSERT INTO access_stats (stat_date, total, successful, failed, denied)
+    VALUES (NEW.access_date, 1,
+            NEW.result = 'SUCCESS', NEW.result = 'FAILED', NEW.result = 'DENIED')
+    ON CONFLICT(stat_date) DO UPDATE SET
+        total = total + 1,
+        successful = successful + (NEW.result = 'SUCCESS'),
+        failed = failed + (NEW.result = 'FAILED'),
+        denied = denied + (NEW.result = 'DENIED');
+END;
+
+-- System logs table - for system events and errors
+CREATE TABLE IF NOT EXISTS system_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_level VARCHAR(20) NOT NULL,
+    module VARCHAR(50) NOT NULL,
+    message TEXT NOT NULL,
+    details TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create indexes for better query performance
+CREATE INDEX IF NOT EXISTS idx_access_logs_user ON access_logs(user_id);
+CREATE INDEX IF NOT EXISTS idx_access_logs_date ON access_logs(access_date);
+CREATE INDEX IF NOT EXISTS idx_access_logs_result ON access_logs(result);
+CREATE INDEX IF NOT EXISTS idx_system_logs_level ON system_logs(log_level);
+CREATE INDEX IF NOT EXISTS idx_system_logs_module ON system_logs(module);
+
+-- Composite indexes for the hot log/lookup paths: they turn the
+-- filter + ORDER BY access_date DESC, access_time DESC queries into
+-- index range scans instead of full-table scans and sorts.
+CREATE INDEX IF NOT EXISTS idx_access_logs_date_time ON access_logs(access_date DESC, access_time DESC);
+CREATE INDEX IF NOT EXISTS idx_access_logs_user_date ON access_logs(user_id, access_date DESC);
+CREATE INDEX IF NOT EXISTS idx_access_logs_result_date ON access_logs(result, access_date DESC);
@@ -38,7 +38,6 @@ CREATE TABLE IF NOT EXISTS face_encodings (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL UNIQUE,
     encoding_data BLOB NOT NULL,  -- Numpy array serialized as bytes
-    encoding_hash VARCHAR(64) NOT NULL,  -- SHA256 hash for integrity
     num_samples INTEGER DEFAULT 1,
     quality_score FLOAT DEFAULT 0.0,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -58,55 +57,14 @@ CREATE TABLE IF NOT EXISTS fingerprint_data (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
--- Access logs table - records all entry/exit attempts
-CREATE TABLE IF NOT EXISTS access_logs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER,  -- NULL if unknown person
-    employee_id VARCHAR(50),  -- Stored separately for historical reference
-    user_name VARCHAR(100),  -- Stored separately for historical reference
-    event_type VARCHAR(10) NOT NULL CHECK(event_type IN ('ENTRY', 'EXIT')),
-    access_date DATE NOT NULL,
-    access_time TIME NOT NULL,
-    result VARCHAR(20) NOT NULL CHECK(result IN ('SUCCESS', 'FAILED', 'DENIED')),
-    face_match BOOLEAN DEFAULT 0,
-    fingerprint_match BOOLEAN DEFAULT 0,
-    failure_reason VARCHAR(255),
-    confidence_score FLOAT,
-    ip_address VARCHAR(45),
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
-);
-
--- System logs table - for system events and errors
-CREATE TABLE IF NOT EXISTS system_logs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    log_level VARCHAR(20) NOT NULL,
-    module VARCHAR(50) NOT NULL,
-    message TEXT NOT NULL,
-    details TEXT,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-
--- Session table for admin web sessions
-CREATE TABLE IF NOT EXISTS admin_sessions (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    admin_id INTEGER NOT NULL,
-    session_token VARCHAR(255) UNIQUE NOT NULL,
-    ip_address VARCHAR(45),
-    user_agent TEXT,
-    expires_at DATETIME NOT NULL,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (admin_id) REFERENCES admin(id) ON DELETE CASCADE
-);
+-- Access logs, system logs, daily access stats and admin sessions are
+-- high-churn tables; they live in the attached logs database (see
+-- logs_schema.sql) so the auth-critical tables here stay hot in cache.
 
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_users_employee_id ON users(employee_id);
 CREATE INDEX IF NOT EXISTS idx_users_active ON users(is_active);
-CREATE INDEX IF NOT EXISTS idx_access_logs_user ON access_logs(user_id);
-CREATE INDEX IF NOT EXISTS idx_access_logs_date ON access_logs(access_date);
-CREATE INDEX IF NOT EXISTS idx_access_logs_result ON access_logs(result);
-CREATE INDEX IF NOT EXISTS idx_system_logs_level ON system_logs(log_level);
-CREATE INDEX IF NOT EXISTS idx_system_logs_module ON system_logs(module);
+CREATE INDEX IF NOT EXISTS idx_fingerprint_data_fpid ON fingerprint_data(fingerprint_id);
 
 -- Insert default admin user (password: admin12)
 -- Password hash generated using bcrypt for password "admin12"
@@ -8,7 +8,9 @@ Multi-factor authentication: Face + Fingerprint required for access.
 import sys
 import threading
 import logging
+import queue
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -22,6 +24,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import cv2
+import numpy as np
 
 # Project imports
 from config.settings import (
@@ -34,9 +37,9 @@ from modules.face_recognition_module import (
     FaceRecognitionEngine, FaceResult, FaceStatus
 )
 from modules.fingerprint_module import (
-    FingerprintManager, FingerprintResult, FingerprintStatus
+    FingerprintResult, FingerprintStatus, get_fingerprint_manager
 )
-from modules.door_control import DoorController, DoorState, DoorMonitor
+from modules.door_control import DoorState, DoorMonitor, get_door_controller
 from modules.auth_engine import AuthState
 
 # Configure logging
@@ -73,18 +76,55 @@ class SmartDoorGUI:
         
         # Initialize components
         self.face_engine = FaceRecognitionEngine()
-        self.fingerprint_manager = FingerprintManager(simulation=simulation)
-        self.door_controller = DoorController(simulation=simulation)
+        self.fingerprint_manager = get_fingerprint_manager(simulation=simulation)
+        self.door_controller = get_door_controller(simulation=simulation)
         self.door_monitor = DoorMonitor(self.door_controller)
         
         # State variables
         self._running = False
+        # Latest-result handoff from the inference thread; maxlen=1 drops
+        # stale results so the GUI never works through a backlog
+        self._result_queue = deque(maxlen=1)
+        self._inference_thread = None
+        # One long-lived fingerprint worker instead of a fresh thread per
+        # authentication attempt; maxsize=1 also collapses duplicate
+        # requests while a scan is already in progress
+        self._fp_queue = queue.Queue(maxsize=1)
+        self._fp_worker = threading.Thread(
+            target=self._fingerprint_worker, daemon=True
+        )
+        self._fp_worker.start()
         self._current_face_result: Optional[FaceResult] = None
         self._current_fp_result: Optional[FingerprintResult] = None
         self._auth_state = AuthState.IDLE
         self._matched_face_user_id = None
         self._auth_start_time = None
         
+        # Reusable display buffers: converting a frame for Tk every tick
+        # would otherwise allocate fresh RGBA arrays at camera rate. Two
+        # RGBA buffers are used double-buffered — the inference worker
+        # writes the next frame while the GUI thread still displays the
+        # previous one.
+        self._resize_buf = np.empty((480, 640, 3), dtype=np.uint8)
+        self._rgba_bufs = [
+            np.empty((480, 640, 4), dtype=np.uint8) for _ in range(2)
+        ]
+        self._rgba_buf_idx = 0
+
+        self._last_time_update = 0.0
+        # Wall-clock read once per tick and shared by the header clock
+        # and activity-log timestamps
+        self._now = datetime.now()
+
+        # Door status updates arrive from the monitor thread; keep only
+        # the latest and schedule at most one pending GUI refresh
+        self._pending_door_status = None
+        self._door_update_pending = False
+
+        # Last-drawn icon states, so steady states skip canvas redraws
+        self._last_fp_color = None
+        self._last_door_locked = None
+
         # GUI variables
         self.camera_image = None
         self.face_status_var = tk.StringVar(value="Initializing...")
@@ -183,7 +223,14 @@ class SmartDoorGUI:
             highlightthickness=0
         )
         self.camera_canvas.pack(pady=10)
-        
+        # Single persistent image item backed by one Tk photo image;
+        # frames paste into the photo in place, so neither the canvas
+        # display list nor the Tk image table grows per tick
+        self.camera_image = ImageTk.PhotoImage('RGBA', (640, 480))
+        self._canvas_img_id = self.camera_canvas.create_image(
+            0, 0, anchor=tk.NW, image=self.camera_image
+        )
+
         # Face status label
         face_status_frame = tk.Frame(camera_frame, bg='#16213e')
         face_status_frame.pack(fill=tk.X)
@@ -331,9 +378,13 @@ class SmartDoorGUI:
             state=tk.DISABLED
         )
         self.activity_text.pack(fill=tk.X, pady=5)
+        self._activity_lines = 0
     
     def _draw_fingerprint_icon(self, color):
-        """Draw fingerprint icon on canvas."""
+        """Draw fingerprint icon on canvas (no-op if already that color)."""
+        if color == self._last_fp_color:
+            return
+        self._last_fp_color = color
         self.fp_canvas.delete("all")
         # Simple fingerprint representation
         cx, cy = 50, 50
@@ -345,7 +396,10 @@ class SmartDoorGUI:
             )
     
     def _draw_door_icon(self, locked=True):
-        """Draw door icon on canvas."""
+        """Draw door icon on canvas (no-op if the state hasn't changed)."""
+        if locked == self._last_door_locked:
+            return
+        self._last_door_locked = locked
         self.door_canvas.delete("all")
         
         # Door frame
@@ -362,10 +416,13 @@ class SmartDoorGUI:
                                         outline=color, width=2, style=tk.ARC)
     
     def _update_time(self):
-        """Update the current time display."""
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.current_time_var.set(now)
-        self.root.after(1000, self._update_time)
+        """Update the current time display.
+
+        Called from _process_loop rather than its own 1 Hz after() chain,
+        so the clock rides the existing tick instead of adding a second
+        recurring Tk callback.
+        """
+        self.current_time_var.set(self._now.strftime("%Y-%m-%d %H:%M:%S"))
     
     def _start_systems(self):
         """Start all system components."""
@@ -393,7 +450,15 @@ class SmartDoorGUI:
             self.door_monitor.start()
             
             self._running = True
-            
+
+            # Face inference runs on its own thread at device speed; the
+            # GUI loop only consumes the most recent result, so a slow
+            # recognition pass can no longer freeze the Tk event loop
+            self._inference_thread = threading.Thread(
+                target=self._inference_worker, daemon=True
+            )
+            self._inference_thread.start()
+
             # Start main processing loop
             self._process_loop()
             
@@ -403,36 +468,86 @@ class SmartDoorGUI:
             logger.error(f"Failed to start systems: {e}")
             messagebox.showerror("Error", f"Failed to start systems: {e}")
     
+    def _convert_frame(self, frame) -> Image.Image:
+        """Convert a BGR frame into a display-ready RGBA PIL image.
+
+        Runs on the inference worker: cv2 releases the GIL during resize
+        and cvtColor, so this overlaps with GUI work instead of blocking
+        it. The returned image wraps one of the double buffers.
+        """
+        buf = self._rgba_bufs[self._rgba_buf_idx]
+        self._rgba_buf_idx = (self._rgba_buf_idx + 1) % len(self._rgba_bufs)
+        if frame.shape[0] != 480 or frame.shape[1] != 640:
+            cv2.resize(frame, (640, 480), dst=self._resize_buf)
+            frame = self._resize_buf
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=buf)
+        return Image.frombuffer('RGBA', (640, 480), buf, 'raw', 'RGBA', 0, 1)
+
+    def _inference_worker(self):
+        """Run face recognition continuously on a background thread."""
+        frame_counter = 0
+        while self._running:
+            try:
+                # Full embedding computation only on every other frame;
+                # the engine reuses its last recognition in between
+                result = self.face_engine.process_frame(
+                    compute_embedding=(frame_counter % 2 == 0)
+                )
+                frame_counter += 1
+                img = (self._convert_frame(result.frame)
+                       if result.frame is not None else None)
+                self._result_queue.append((result, img))
+                if result.status == FaceStatus.CAMERA_ERROR:
+                    time.sleep(0.5)  # No frames coming; don't spin
+            except Exception as e:
+                logger.error(f"Inference worker error: {e}")
+                time.sleep(0.1)
+
     def _process_loop(self):
         """Main processing loop - runs on GUI thread via after()."""
         if not self._running:
             return
-        
+
+        # One wall-clock read per tick, shared wherever a timestamp is
+        # formatted during this iteration
+        self._now = datetime.now()
+
+        # Refresh the header clock at most once a second
+        now = time.monotonic()
+        if now - self._last_time_update >= 1.0:
+            self._update_time()
+            self._last_time_update = now
+
         try:
-            # Process face recognition
-            face_result = self.face_engine.process_frame()
-            self._update_face_display(face_result)
-            
-            # Update authentication state machine
-            self._process_authentication(face_result)
-            
+            # Consume the latest face result, if the worker produced one
+            try:
+                face_result, display_img = self._result_queue.popleft()
+            except IndexError:
+                face_result = None
+
+            if face_result is not None:
+                self._update_face_display(face_result, display_img)
+
+                # Update authentication state machine
+                self._process_authentication(face_result)
+
         except Exception as e:
             logger.error(f"Process loop error: {e}")
-        
+
         # Schedule next iteration
         self.root.after(GUI_UPDATE_INTERVAL, self._process_loop)
     
-    def _update_face_display(self, face_result: FaceResult):
-        """Update the camera display with face detection results."""
-        if face_result.frame is not None:
-            # Convert frame to PhotoImage
-            frame = cv2.cvtColor(face_result.frame, cv2.COLOR_BGR2RGB)
-            frame = cv2.resize(frame, (640, 480))
-            img = Image.fromarray(frame)
-            self.camera_image = ImageTk.PhotoImage(image=img)
-            
-            # Update canvas
-            self.camera_canvas.create_image(0, 0, anchor=tk.NW, image=self.camera_image)
+    def _update_face_display(self, face_result: FaceResult,
+                             display_img: Optional[Image.Image] = None):
+        """Update the camera display with face detection results.
+
+        The colour conversion already happened on the inference worker;
+        this method only pushes the prepared image to Tk.
+        """
+        if display_img is not None:
+            # Paste into the persistent photo image; the canvas item
+            # already references it, so no per-frame Tk allocation occurs
+            self.camera_image.paste(display_img)
         
         # Update face status
         status_text = face_result.status.value
@@ -470,8 +585,11 @@ class SmartDoorGUI:
                     
                     self._log_activity(f"Face matched: {face_result.user_name}")
                     
-                    # Start fingerprint verification in background
-                    threading.Thread(target=self._verify_fingerprint, daemon=True).start()
+                    # Hand verification to the persistent worker thread
+                    try:
+                        self._fp_queue.put_nowait(True)
+                    except queue.Full:
+                        pass  # A scan is already underway
         
         elif current_state == AuthState.FACE_MATCHED:
             # Check for timeout
@@ -484,6 +602,14 @@ class SmartDoorGUI:
             if time.time() - self._auth_start_time > 5:
                 self._reset_auth_state()
     
+    def _fingerprint_worker(self):
+        """Long-lived worker that runs fingerprint scans on demand."""
+        while True:
+            task = self._fp_queue.get()
+            if task is None:  # Shutdown sentinel
+                break
+            self._verify_fingerprint()
+
     def _verify_fingerprint(self):
         """Verify fingerprint in background thread."""
         try:
@@ -595,8 +721,23 @@ class SmartDoorGUI:
         self._draw_fingerprint_icon('#444444')
     
     def _on_door_status_change(self, status):
-        """Handle door status changes."""
-        self.root.after(0, lambda: self._update_door_display(status))
+        """Handle door status changes.
+
+        Rapid transitions (UNLOCKING then UNLOCKED) coalesce into a
+        single redraw: only the most recent status is kept, and at most
+        one idle callback is ever pending.
+        """
+        self._pending_door_status = status
+        if not self._door_update_pending:
+            self._door_update_pending = True
+            self.root.after_idle(self._flush_door_status)
+
+    def _flush_door_status(self):
+        """Render the most recent pending door status (GUI thread)."""
+        self._door_update_pending = False
+        status = self._pending_door_status
+        if status is not None:
+            self._update_door_display(status)
     
     def _update_door_display(self, status):
         """Update door status display."""
@@ -623,25 +764,33 @@ class SmartDoorGUI:
     
     def _log_activity(self, message: str):
         """Add a message to the activity log."""
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        timestamp = self._now.strftime("%H:%M:%S")
         log_entry = f"[{timestamp}] {message}\n"
         
         self.activity_text.config(state=tk.NORMAL)
         self.activity_text.insert(tk.END, log_entry)
         self.activity_text.see(tk.END)
-        
-        # Keep only last 100 lines
-        lines = self.activity_text.get("1.0", tk.END).split('\n')
-        if len(lines) > 100:
-            self.activity_text.delete("1.0", f"{len(lines)-100}.0")
-        
+
+        # Keep only last 100 lines; a counter makes the trim O(1) instead
+        # of re-reading and splitting the whole widget per message
+        self._activity_lines += 1
+        if self._activity_lines > 100:
+            self.activity_text.delete("1.0", "2.0")
+            self._activity_lines -= 1
+
         self.activity_text.config(state=tk.DISABLED)
     
     def on_closing(self):
         """Handle window close event."""
         if messagebox.askokcancel("Quit", "Are you sure you want to exit?"):
             self._running = False
-            
+
+            # Stop the fingerprint worker
+            try:
+                self._fp_queue.put_nowait(None)
+            except queue.Full:
+                pass
+
             # Stop all components
             self.door_monitor.stop()
             self.door_controller.cleanup()
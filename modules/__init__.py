@@ -1,50 +1,54 @@
-"""
-Smart Door Security System - Modules Package
-"""
-
-from modules.face_recognition_module import (
-    FaceRecognitionEngine,
-    FaceEnrollment,
-    FaceResult,
-    FaceStatus,
-    CameraManager
-)
-
-from modules.fingerprint_module import (
-    FingerprintManager,
-    FingerprintSensor,
-    FingerprintResult,
-    FingerprintStatus
-)
-
-from modules.door_control import (
-    DoorController,
-    DoorMonitor,
-    DoorState,
-    DoorStatus
-)
-
-from modules.auth_engine import (
-    AuthenticationEngine,
-    AuthSession,
-    AuthState
-)
-
-__all__ = [
-    'FaceRecognitionEngine',
-    'FaceEnrollment',
-    'FaceResult',
-    'FaceStatus',
-    'CameraManager',
-    'FingerprintManager',
-    'FingerprintSensor',
-    'FingerprintResult',
-    'FingerprintStatus',
-    'DoorController',
-    'DoorMonitor',
-    'DoorState',
-    'DoorStatus',
-    'AuthenticationEngine',
-    'AuthSession',
-    'AuthState'
-]
+"""
+Smart Door Security System - Modules Package
+"""
+
+from modules.face_recognition_module import (
+    FaceRecognitionEngine,
+    FaceEnrollment,
+    FaceResult,
+    FaceStatus,
+    CameraManager
+)
+
+from modules.fingerprint_module import (
+    FingerprintManager,
+    FingerprintSensor,
+    FingerprintResult,
+    FingerprintStatus,
+    get_fingerprint_manager
+)
+
+from modules.door_control import (
+    DoorController,
+    DoorMonitor,
+    DoorState,
+    DoorStatus,
+    get_door_controller
+)
+
+from modules.auth_engine import (
+    AuthenticationEngine,
+    AuthSession,
+    AuthState
+)
+
+__all__ = [
+    'FaceRecognitionEngine',
+    'FaceEnrollment',
+    'FaceResult',
+    'FaceStatus',
+    'CameraManager',
+    'FingerprintManager',
+    'FingerprintSensor',
+    'FingerprintResult',
+    'FingerprintStatus',
+    'get_fingerprint_manager',
+    'DoorController',
+    'DoorMonitor',
+    'DoorState',
+    'DoorStatus',
+    'get_door_controller',
+    'AuthenticationEngine',
+    'AuthSession',
+    'AuthState'
+]
@@ -1,511 +1,939 @@
-"""
-Smart Door Security System - Face Recognition Module
-Handles face detection, encoding, and matching using face_recognition library.
-"""
-
-import cv2
-import numpy as np
-import face_recognition
-import threading
-import logging
-from typing import Optional, Tuple, List, Dict, Any
-from dataclasses import dataclass
-from enum import Enum
-import time
-import sys
-from pathlib import Path
-import queue
-import weakref
-from collections import deque
-import gc
-import requests
-import json
-
-# Add parent directory for imports
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from config.settings import (
-    CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT,
-    FACE_RECOGNITION_TOLERANCE, FACE_DETECTION_MODEL, FACE_ENCODING_JITTERS,
-    API_BASE_URL
-)
-from database.db_manager import FaceEncodingRepository, UserRepository, SystemLogRepository
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-
-class FaceStatus(Enum):
-    """Face detection/recognition status."""
-    NO_FACE = "No Face Detected"
-    FACE_DETECTED = "Face Detected"
-    FACE_MATCHED = "Face Matched"
-    UNKNOWN_FACE = "Unknown Face"
-    MULTIPLE_FACES = "Multiple Faces Detected"
-    CAMERA_ERROR = "Camera Error"
-
-
-@dataclass
-class FaceResult:
-    """Result of face recognition operation."""
-    status: FaceStatus
-    user_id: Optional[int] = None
-    user_name: Optional[str] = None
-    employee_id: Optional[str] = None
-    confidence: float = 0.0
-    face_location: Optional[Tuple[int, int, int, int]] = None
-    frame: Optional[np.ndarray] = None
-
-
-class CameraManager:
-    """Manages webcam access with thread safety."""
-    
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
-    
-    def __init__(self):
-        if self._initialized:
-            return
-        
-        self._camera = None
-        self._frame_lock = threading.Lock()
-        self._current_frame = None
-        self._running = False
-        self._capture_thread = None
-        self._initialized = True
-        self.system_log = SystemLogRepository()
-    
-    def start(self) -> bool:
-        """Start camera capture."""
-        if self._running:
-            return True
-        
-        try:
-            self._camera = cv2.VideoCapture(CAMERA_INDEX)
-            if not self._camera.isOpened():
-                logger.error("Failed to open camera")
-                self.system_log.error("CameraManager", "Failed to open camera")
-                return False
-            
-            # Set camera properties
-            self._camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-            self._camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
-            self._camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            
-            self._running = True
-            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
-            self._capture_thread.start()
-            
-            logger.info("Camera started successfully")
-            self.system_log.info("CameraManager", "Camera started")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Camera start error: {e}")
-            self.system_log.error("CameraManager", f"Camera start error: {str(e)}")
-            return False
-    
-    def _capture_loop(self):
-        """Continuous frame capture loop."""
-        while self._running:
-            try:
-                ret, frame = self._camera.read()
-                if ret:
-                    with self._frame_lock:
-                        self._current_frame = frame.copy()
-                else:
-                    time.sleep(0.01)
-            except Exception as e:
-                logger.error(f"Capture error: {e}")
-                time.sleep(0.1)
-    
-    def get_frame(self) -> Optional[np.ndarray]:
-        """Get the current frame."""
-        with self._frame_lock:
-            if self._current_frame is not None:
-                return self._current_frame.copy()
-        return None
-    
-    def stop(self):
-        """Stop camera capture."""
-        self._running = False
-        if self._capture_thread:
-            self._capture_thread.join(timeout=2.0)
-        if self._camera:
-            self._camera.release()
-            self._camera = None
-        logger.info("Camera stopped")
-    
-    def is_running(self) -> bool:
-        return self._running
-
-
-class FaceRecognitionEngine:
-    """Face recognition engine for detection and matching."""
-    
-    def __init__(self):
-        self.camera = CameraManager()
-        self.face_repo = FaceEncodingRepository()
-        self.user_repo = UserRepository()
-        self.system_log = SystemLogRepository()
-        
-        # Cache for known face encodings
-        self._known_encodings: List[np.ndarray] = []
-        self._known_user_data: List[Dict] = []
-        self._cache_lock = threading.Lock()
-        self._last_cache_update = 0
-        self._cache_ttl = 30  # seconds
-        
-        # Recognition state
-        self._current_result: Optional[FaceResult] = None
-        self._result_lock = threading.Lock()
-    
-    def start(self) -> bool:
-        """Start the face recognition engine."""
-        if not self.camera.start():
-            return False
-        self._refresh_known_faces()
-        return True
-    
-    def stop(self):
-        """Stop the face recognition engine."""
-        self.camera.stop()
-    
-    def _refresh_known_faces(self):
-        """Refresh the cache of known face encodings."""
-        try:
-            with self._cache_lock:
-                encodings_data = self.face_repo.get_all_encodings()
-                self._known_encodings = []
-                self._known_user_data = []
-                
-                for data in encodings_data:
-                    self._known_encodings.append(data['encoding'])
-                    self._known_user_data.append({
-                        'user_id': data['user_id'],
-                        'name': data['name'],
-                        'employee_id': data['employee_id']
-                    })
-                
-                self._last_cache_update = time.time()
-                logger.info(f"Loaded {len(self._known_encodings)} known faces")
-                
-        except Exception as e:
-            logger.error(f"Error refreshing known faces: {e}")
-            self.system_log.error("FaceRecognition", f"Cache refresh error: {str(e)}")
-    
-    def _check_cache_freshness(self):
-        """Check if cache needs refresh."""
-        if time.time() - self._last_cache_update > self._cache_ttl:
-            self._refresh_known_faces()
-    
-    def process_frame(self) -> FaceResult:
-        """Process current camera frame for face recognition."""
-        frame = self.camera.get_frame()
-        
-        if frame is None:
-            return FaceResult(status=FaceStatus.CAMERA_ERROR)
-        
-        try:
-            # Convert BGR to RGB for face_recognition
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Resize for faster processing
-            small_frame = cv2.resize(rgb_frame, (0, 0), fx=0.25, fy=0.25)
-            
-            # Detect faces
-            face_locations = face_recognition.face_locations(
-                small_frame, 
-                model=FACE_DETECTION_MODEL
-            )
-            
-            if not face_locations:
-                return FaceResult(status=FaceStatus.NO_FACE, frame=frame)
-            
-            if len(face_locations) > 1:
-                # Draw rectangles for multiple faces
-                frame_with_boxes = self._draw_face_boxes(frame, face_locations, scale=4)
-                return FaceResult(
-                    status=FaceStatus.MULTIPLE_FACES,
-                    frame=frame_with_boxes
-                )
-            
-            # Single face detected - proceed with recognition
-            face_location = face_locations[0]
-            
-            # Get face encoding
-            face_encodings = face_recognition.face_encodings(
-                small_frame, 
-                [face_location],
-                num_jitters=FACE_ENCODING_JITTERS
-            )
-            
-            if not face_encodings:
-                scaled_location = tuple(coord * 4 for coord in face_location)
-                frame_with_box = self._draw_face_box(
-                    frame, scaled_location, "Face Detected", (255, 255, 0)
-                )
-                return FaceResult(
-                    status=FaceStatus.FACE_DETECTED,
-                    face_location=scaled_location,
-                    frame=frame_with_box
-                )
-            
-            face_encoding = face_encodings[0]
-            
-            # Refresh cache if needed
-            self._check_cache_freshness()
-            
-            # Compare with known faces
-            with self._cache_lock:
-                if not self._known_encodings:
-                    scaled_location = tuple(coord * 4 for coord in face_location)
-                    frame_with_box = self._draw_face_box(
-                        frame, scaled_location, "Unknown Face", (0, 0, 255)
-                    )
-                    return FaceResult(
-                        status=FaceStatus.UNKNOWN_FACE,
-                        face_location=scaled_location,
-                        frame=frame_with_box
-                    )
-                
-                # Calculate face distances
-                face_distances = face_recognition.face_distance(
-                    self._known_encodings, 
-                    face_encoding
-                )
-                
-                best_match_idx = np.argmin(face_distances)
-                best_distance = face_distances[best_match_idx]
-                
-                # Check if match is within tolerance
-                if best_distance <= FACE_RECOGNITION_TOLERANCE:
-                    user_data = self._known_user_data[best_match_idx]
-                    confidence = 1.0 - best_distance
-                    scaled_location = tuple(coord * 4 for coord in face_location)
-                    
-                    label = f"{user_data['name']} ({confidence*100:.1f}%)"
-                    frame_with_box = self._draw_face_box(
-                        frame, scaled_location, label, (0, 255, 0)
-                    )
-                    
-                    return FaceResult(
-                        status=FaceStatus.FACE_MATCHED,
-                        user_id=user_data['user_id'],
-                        user_name=user_data['name'],
-                        employee_id=user_data['employee_id'],
-                        confidence=confidence,
-                        face_location=scaled_location,
-                        frame=frame_with_box
-                    )
-                else:
-                    scaled_location = tuple(coord * 4 for coord in face_location)
-                    frame_with_box = self._draw_face_box(
-                        frame, scaled_location, "Unknown Face", (0, 0, 255)
-                    )
-                    return FaceResult(
-                        status=FaceStatus.UNKNOWN_FACE,
-                        face_location=scaled_location,
-                        frame=frame_with_box
-                    )
-                    
-        except Exception as e:
-            logger.error(f"Face processing error: {e}")
-            self.system_log.error("FaceRecognition", f"Processing error: {str(e)}")
-            return FaceResult(status=FaceStatus.CAMERA_ERROR, frame=frame)
-    
-    def _draw_face_box(self, frame: np.ndarray, location: Tuple[int, int, int, int],
-                       label: str, color: Tuple[int, int, int]) -> np.ndarray:
-        """Draw a rectangle around a detected face."""
-        frame_copy = frame.copy()
-        top, right, bottom, left = location
-        
-        # Draw rectangle
-        cv2.rectangle(frame_copy, (left, top), (right, bottom), color, 2)
-        
-        # Draw label background
-        cv2.rectangle(frame_copy, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
-        
-        # Draw label text
-        cv2.putText(
-            frame_copy, label, (left + 6, bottom - 10),
-            cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1
-        )
-        
-        return frame_copy
-    
-    def _draw_face_boxes(self, frame: np.ndarray, 
-                         locations: List[Tuple[int, int, int, int]],
-                         scale: int = 1) -> np.ndarray:
-        """Draw rectangles around multiple detected faces."""
-        frame_copy = frame.copy()
-        for location in locations:
-            top, right, bottom, left = [coord * scale for coord in location]
-            cv2.rectangle(frame_copy, (left, top), (right, bottom), (255, 255, 0), 2)
-        return frame_copy
-    
-    def get_current_frame(self) -> Optional[np.ndarray]:
-        """Get current camera frame without processing."""
-        return self.camera.get_frame()
-    
-    def refresh_cache(self):
-        """Force refresh of known faces cache."""
-        self._refresh_known_faces()
-
-
-class FaceEnrollment:
-    """Handles face enrollment for new users."""
-    
-    def __init__(self):
-        self.camera = CameraManager()
-        self.face_repo = FaceEncodingRepository()
-        self.user_repo = UserRepository()
-        self.system_log = SystemLogRepository()
-    
-    def enroll_face(self, user_id: int, num_samples: int = 5, 
-                    callback=None) -> Tuple[bool, str]:
-        """
-        Enroll a face for a user.
-        
-        Args:
-            user_id: The user ID to enroll
-            num_samples: Number of face samples to capture
-            callback: Optional callback for progress updates (samples_captured, total)
-        
-        Returns:
-            Tuple of (success, message)
-        """
-        # Verify user exists
-        user = self.user_repo.get_by_id(user_id)
-        if not user:
-            return False, "User not found"
-        
-        # Start camera if not running
-        if not self.camera.is_running():
-            if not self.camera.start():
-                return False, "Failed to start camera"
-        
-        encodings = []
-        samples_captured = 0
-        max_attempts = num_samples * 10
-        attempts = 0
-        
-        logger.info(f"Starting face enrollment for user {user_id}")
-        
-        while samples_captured < num_samples and attempts < max_attempts:
-            attempts += 1
-            frame = self.camera.get_frame()
-            
-            if frame is None:
-                time.sleep(0.1)
-                continue
-            
-            # Convert to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Detect faces
-            face_locations = face_recognition.face_locations(rgb_frame, model=FACE_DETECTION_MODEL)
-            
-            if len(face_locations) != 1:
-                time.sleep(0.1)
-                continue
-            
-            # Get encoding
-            face_encodings = face_recognition.face_encodings(
-                rgb_frame, 
-                face_locations,
-                num_jitters=FACE_ENCODING_JITTERS
-            )
-            
-            if face_encodings:
-                encodings.append(face_encodings[0])
-                samples_captured += 1
-                
-                if callback:
-                    callback(samples_captured, num_samples)
-                
-                logger.info(f"Captured sample {samples_captured}/{num_samples}")
-                time.sleep(0.3)  # Brief pause between captures
-        
-        if samples_captured < num_samples:
-            return False, f"Only captured {samples_captured}/{num_samples} samples"
-        
-        # Calculate average encoding
-        average_encoding = np.mean(encodings, axis=0)
-        
-        # Calculate quality score (consistency of encodings)
-        distances = [
-            face_recognition.face_distance([average_encoding], enc)[0]
-            for enc in encodings
-        ]
-        quality_score = 1.0 - np.mean(distances)
-        
-        # Save to database
-        try:
-            self.face_repo.save_encoding(
-                user_id=user_id,
-                encoding_array=average_encoding,
-                num_samples=num_samples,
-                quality_score=quality_score
-            )
-            
-            # Update user's face_enrolled status in database
-            self.user_repo.update(user_id, face_enrolled=True)
-            
-            # Call backend API to update enrollment status
-            self._update_enrollment_status_api(user_id, 'face', True)
-            
-            self.system_log.info(
-                "FaceEnrollment",
-                f"Face enrolled for user {user['first_name']} {user['last_name']}",
-                f"Quality score: {quality_score:.2f}"
-            )
-            
-            return True, f"Face enrolled successfully (Quality: {quality_score*100:.1f}%)"
-            
-        except Exception as e:
-            logger.error(f"Error saving face encoding: {e}")
-            self.system_log.error("FaceEnrollment", f"Save error: {str(e)}")
-            return False, f"Error saving face data: {str(e)}"
-    
-    def _update_enrollment_status_api(self, user_id: int, biometric_type: str, enrolled: bool):
-        """
-        Call backend API to update enrollment status.
-        
-        Args:
-            user_id: User ID
-            biometric_type: 'face' or 'fingerprint'
-            enrolled: True if enrolled, False if not
-        """
-        try:
-            url = f"{API_BASE_URL}/users/{user_id}/enrollment"
-            data = {
-                'biometric_type': biometric_type,
-                'enrolled': enrolled
-            }
-            
-            response = requests.post(url, json=data, timeout=5)
-            
-            if response.status_code == 200:
-                logger.info(f"API enrollment status update successful for user {user_id}")
-            else:
-                logger.warning(f"API enrollment status update failed: {response.status_code}")
-                
-        except requests.RequestException as e:
-            logger.warning(f"API enrollment status update failed: {e}")
-        except Exception as e:
-            logger.error(f"Error updating enrollment status via API: {e}")
-
-
-# Convenience function for external use
-def get_face_recognition_engine() -> FaceRecognitionEngine:
-    """Get or create the face recognition engine singleton."""
-    return FaceRecognitionEngine()
+"""
+Smart Door Security System - Face Recognition Module
+Handles face detection, encoding, and matching using face_recognition library.
+
+face_recognition is used for detection and encoding only; all distance
+math runs directly on the cached float32 gallery (its face_distance
+wrapper re-validates and re-wraps its inputs on every call).
+"""
+
+import cv2
+import numpy as np
+import dlib
+import face_recognition
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Any
+from dataclasses import dataclass
+from enum import Enum
+import math
+import time
+import sys
+from pathlib import Path
+import queue
+import weakref
+from collections import deque
+import gc
+import requests
+import json
+
+# Add parent directory for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import (
+    CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT,
+    FACE_RECOGNITION_TOLERANCE, FACE_DETECTION_MODEL, FACE_ENCODING_JITTERS,
+    API_BASE_URL
+)
+from database.db_manager import FaceEncodingRepository, UserRepository, SystemLogRepository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Try to import Numba for an optional fused distance kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _squared_distances(matrix, probe):
+        """Squared Euclidean distance from probe to every gallery row.
+
+        Specialized for the 128-D encodings this pipeline always
+        produces: the inner loop strides by four with independent
+        accumulators, so LLVM keeps four FMA chains in flight per row
+        instead of serializing on one. No temporaries, and deliberately
+        not parallel - thread fan-out costs more than it saves at the
+        gallery sizes a door sees.
+        """
+        n, dim = matrix.shape
+        out = np.empty(n, np.float32)
+        for i in range(n):
+            acc0 = np.float32(0.0)
+            acc1 = np.float32(0.0)
+            acc2 = np.float32(0.0)
+            acc3 = np.float32(0.0)
+            for k in range(0, dim - 3, 4):
+                d0 = matrix[i, k] - probe[k]
+                d1 = matrix[i, k + 1] - probe[k + 1]
+                d2 = matrix[i, k + 2] - probe[k + 2]
+                d3 = matrix[i, k + 3] - probe[k + 3]
+                acc0 += d0 * d0
+                acc1 += d1 * d1
+                acc2 += d2 * d2
+                acc3 += d3 * d3
+            for k in range(dim - dim % 4, dim):
+                d0 = matrix[i, k] - probe[k]
+                acc0 += d0 * d0
+            out[i] = acc0 + acc1 + acc2 + acc3
+        return out
+
+
+class FaceStatus(Enum):
+    """Face detection/recognition status."""
+    NO_FACE = "No Face Detected"
+    FACE_DETECTED = "Face Detected"
+    FACE_MATCHED = "Face Matched"
+    UNKNOWN_FACE = "Unknown Face"
+    MULTIPLE_FACES = "Multiple Faces Detected"
+    CAMERA_ERROR = "Camera Error"
+
+
+@dataclass
+class FaceResult:
+    """Result of face recognition operation."""
+    status: FaceStatus
+    user_id: Optional[int] = None
+    user_name: Optional[str] = None
+    employee_id: Optional[str] = None
+    confidence: float = 0.0
+    face_location: Optional[Tuple[int, int, int, int]] = None
+    frame: Optional[np.ndarray] = None
+
+
+class CameraManager:
+    """Manages webcam access with thread safety."""
+    
+    _instance = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        
+        self._camera = None
+        self._frame_lock = threading.Lock()
+        self._current_frame = None
+        # Set when a consumer wants a fresh frame; the capture loop only
+        # pays for a decode while this is pending. Starts set so the
+        # first frame is available immediately.
+        self._frame_requested = threading.Event()
+        self._frame_requested.set()
+        self._running = False
+        self._capture_thread = None
+        self._initialized = True
+        self.system_log = SystemLogRepository()
+    
+    def start(self) -> bool:
+        """Start camera capture."""
+        if self._running:
+            return True
+        
+        try:
+            self._camera = cv2.VideoCapture(CAMERA_INDEX)
+            if not self._camera.isOpened():
+                logger.error("Failed to open camera")
+                self.system_log.error("CameraManager", "Failed to open camera")
+                return False
+            
+            # Set camera properties
+            self._camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+            self._camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+            self._camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            # Ask the driver for MJPG so frames the consumer never wants
+            # are discarded still compressed; backends that don't
+            # support it simply ignore the request
+            self._camera.set(
+                cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG')
+            )
+
+            self._running = True
+            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._capture_thread.start()
+            
+            logger.info("Camera started successfully")
+            self.system_log.info("CameraManager", "Camera started")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Camera start error: {e}")
+            self.system_log.error("CameraManager", f"Camera start error: {str(e)}")
+            return False
+    
+    def _capture_loop(self):
+        """Continuous frame capture loop."""
+        while self._running:
+            try:
+                # grab() only advances the driver queue - no decode - so
+                # frames nobody asked for cost almost nothing to drop
+                if not self._camera.grab():
+                    time.sleep(0.01)
+                    continue
+                if self._frame_requested.is_set():
+                    self._frame_requested.clear()
+                    ret, frame = self._camera.retrieve()
+                    if ret:
+                        # retrieve() hands back a freshly allocated array
+                        # each call, so publishing the reference is safe.
+                        # Do not switch to retrieve(dst)/recycled buffers:
+                        # results, the static-scene cache and the GUI all
+                        # retain published frames, and reusing their
+                        # memory would tear them mid-display.
+                        with self._frame_lock:
+                            self._current_frame = frame
+            except Exception as e:
+                logger.error(f"Capture error: {e}")
+                time.sleep(0.1)
+    
+    def get_frame(self) -> Optional[np.ndarray]:
+        """Get the current frame (at most one capture tick old).
+
+        Returns a reference, not a copy: the capture thread never writes
+        into a frame once published, so callers may keep the array or
+        draw on it without racing the camera. Also flags the capture
+        loop to decode a fresh frame for the next call.
+        """
+        self._frame_requested.set()
+        with self._frame_lock:
+            return self._current_frame
+    
+    def stop(self):
+        """Stop camera capture."""
+        self._running = False
+        if self._capture_thread:
+            self._capture_thread.join(timeout=2.0)
+        if self._camera:
+            self._camera.release()
+            self._camera = None
+        logger.info("Camera stopped")
+    
+    def is_running(self) -> bool:
+        return self._running
+
+
+class FaceRecognitionEngine:
+    """Face recognition engine for detection and matching.
+
+    Performance note: detection and encoding speed depend heavily on how
+    dlib was built. Prebuilt wheels often ship without AVX or CUDA; for a
+    4-8x speedup build dlib from source with
+    ``-DUSE_AVX_INSTRUCTIONS=1`` (and ``-DDLIB_USE_CUDA=1`` on a machine
+    with a usable GPU). start() logs a warning when the installed build
+    lacks these so slow inference is diagnosable from the system log.
+
+    Threading: process_frame is synchronous by design; overlap lives in
+    the callers (the GUI runs it on a dedicated inference thread while
+    Tk renders, enrollment overlaps capture, detection and encoding on
+    separate workers) and in the capture thread, which grabs and decodes
+    independently of processing.
+    """
+
+    # Static-scene gate: frames whose 16x16 grayscale thumbnail differs
+    # from the last processed one by less than this L1 sum (~5 gray
+    # levels averaged over 256 pixels) reuse the previous result
+    _THUMB_SIZE = (16, 16)
+    _STATIC_SAD_THRESHOLD = 1280
+
+    # Match threshold in squared-distance space, so per-frame compares
+    # never need a square root
+    _TOLERANCE_SQ = FACE_RECOGNITION_TOLERANCE ** 2
+
+    # Rendered-label cache bound; entries are evicted oldest-first
+    _LABEL_CACHE_MAX = 64
+
+    def __init__(self):
+        self.camera = CameraManager()
+        self.face_repo = FaceEncodingRepository()
+        self.user_repo = UserRepository()
+        self.system_log = SystemLogRepository()
+        
+        # Cache for known face encodings: one (N, 128) matrix so a probe is
+        # scored against everyone in a single vectorized distance call.
+        # Exact linear scan on purpose: an ANN index (HNSW et al.) only
+        # beats it past thousands of enrollees, and approximate recall
+        # is a poor trade on an access-control decision
+        self._known_matrix: Optional[np.ndarray] = None
+        self._known_sq_norms: Optional[np.ndarray] = None
+        self._known_user_data: List[Dict] = []
+        # Identity of the repository matrix the cache was last built
+        # from; refreshes that hand back the same object are no-ops
+        self._known_matrix_source: Optional[np.ndarray] = None
+        self._cache_lock = threading.Lock()
+        self._last_cache_update = 0
+        self._cache_ttl = 30  # seconds
+        
+        # Recognition state
+        self._current_result: Optional[FaceResult] = None
+        self._result_lock = threading.Lock()
+        # Last full recognition outcome, reused on frames where the caller
+        # asks to skip the (expensive) embedding step
+        self._last_recognition: Optional[FaceResult] = None
+        # Whether the last detector pass saw any face at all
+        self._face_candidate = False
+        # Quarter-resolution scratch buffers, allocated on first frame
+        # and reused so the per-frame path allocates nothing
+        self._small_bgr: Optional[np.ndarray] = None
+        self._small_rgb: Optional[np.ndarray] = None
+        # Static-scene gate state: thumbnail of the last frame that went
+        # through the full pipeline, plus the result it produced
+        self._prev_thumb: Optional[np.ndarray] = None
+        self._static_result: Optional[FaceResult] = None
+        # Pre-rendered label strips keyed by (text, color): putText
+        # rasterizes glyphs on every call, so a steady match reuses the
+        # cached pixels instead of re-rendering the same name at 20 Hz
+        self._label_cache: Dict[Tuple[str, Tuple[int, int, int]], np.ndarray] = {}
+    
+    def start(self) -> bool:
+        """Start the face recognition engine."""
+        if not self.camera.start():
+            return False
+        self._log_build_capabilities()
+        self._refresh_known_faces()
+        if NUMBA_AVAILABLE:
+            # Pay the JIT compile at startup rather than on the first probe
+            _squared_distances(
+                np.zeros((1, 128), np.float32), np.zeros(128, np.float32)
+            )
+        return True
+
+    def _log_build_capabilities(self):
+        """Log how the installed dlib and OpenCV builds were compiled.
+
+        AVX/NEON and CUDA support are compile-time options; when missing,
+        inference runs several times slower than it has to, which is
+        worth surfacing once at startup rather than leaving to guesswork.
+        """
+        use_cuda = bool(getattr(dlib, 'DLIB_USE_CUDA', False))
+        use_avx = bool(getattr(dlib, 'USE_AVX_INSTRUCTIONS', False))
+        logger.info(f"dlib build: AVX={use_avx}, CUDA={use_cuda}")
+        if use_cuda:
+            # Detection and the encoder ResNet (including jittered
+            # passes, which dlib batches on-device) run on the GPU
+            logger.info("dlib CUDA build detected; encoding runs on GPU")
+        if not use_avx:
+            logger.warning(
+                "dlib was built without AVX instructions; face detection "
+                "and encoding will be slow. Rebuild dlib from source with "
+                "-DUSE_AVX_INSTRUCTIONS=1 for a significant speedup."
+            )
+            self.system_log.warning(
+                "FaceRecognition", "dlib built without AVX support"
+            )
+
+        # OpenCV: turn the optimized (SIMD) dispatch on and confirm the
+        # build actually carries vector instructions
+        cv2.setUseOptimized(True)
+        if not cv2.useOptimized():
+            logger.warning("OpenCV optimized code paths are disabled")
+            self.system_log.warning(
+                "FaceRecognition", "OpenCV running unoptimized"
+            )
+        build_info = cv2.getBuildInformation()
+        if not any(isa in build_info for isa in ('AVX', 'SSE4', 'NEON')):
+            logger.warning(
+                "OpenCV build lists no AVX/SSE4/NEON support; image "
+                "operations will be slow on this install"
+            )
+            self.system_log.warning(
+                "FaceRecognition", "OpenCV built without SIMD support"
+            )
+    
+    def stop(self):
+        """Stop the face recognition engine."""
+        self.camera.stop()
+    
+    def _refresh_known_faces(self):
+        """Refresh the cache of known face encodings."""
+        try:
+            with self._cache_lock:
+                encodings_data = self.face_repo.get_all_encodings()
+                # The repository keeps its own data_version-stamped cache
+                # and returns the identical matrix object until the
+                # database actually changes; in that steady state there
+                # is nothing to rebuild here
+                if (encodings_data['matrix'] is not None
+                        and encodings_data['matrix'] is self._known_matrix_source):
+                    self._last_cache_update = time.time()
+                    return
+                self._known_matrix_source = encodings_data['matrix']
+                self._known_matrix = encodings_data['matrix']
+                # Row norms precomputed once so matching reduces to a
+                # single BLAS matrix-vector product per probe
+                if self._known_matrix is not None and len(self._known_matrix):
+                    # BLAS wants contiguous rows; a no-op when the
+                    # repository already built the matrix that way
+                    self._known_matrix = np.ascontiguousarray(
+                        self._known_matrix
+                    )
+                    self._known_sq_norms = np.einsum(
+                        'ij,ij->i', self._known_matrix, self._known_matrix
+                    )
+                else:
+                    self._known_sq_norms = None
+                self._known_user_data = [
+                    {'user_id': int(user_id), 'name': name, 'employee_id': employee_id}
+                    for user_id, name, employee_id in zip(
+                        encodings_data['user_ids'],
+                        encodings_data['names'],
+                        encodings_data['employee_ids'])
+                ]
+
+                self._last_cache_update = time.time()
+                logger.info(f"Loaded {len(self._known_user_data)} known faces")
+                
+        except Exception as e:
+            logger.error(f"Error refreshing known faces: {e}")
+            self.system_log.error("FaceRecognition", f"Cache refresh error: {str(e)}")
+    
+    def _check_cache_freshness(self):
+        """Check if cache needs refresh."""
+        if time.time() - self._last_cache_update > self._cache_ttl:
+            self._refresh_known_faces()
+    
+    def process_frame(self, compute_embedding: bool = True) -> FaceResult:
+        """
+        Process current camera frame for face recognition.
+
+        Args:
+            compute_embedding: When False and a single face is present,
+                skip the embedding/matching step and reuse the previous
+                recognition outcome with an updated frame and box. Lets
+                callers halve the number of CNN forward passes.
+        """
+        frame = self.camera.get_frame()
+
+        if frame is None:
+            self._face_candidate = False
+            return FaceResult(status=FaceStatus.CAMERA_ERROR)
+
+        try:
+            # Static-scene gate: a 16x16 thumbnail SAD costs a few
+            # hundred byte ops versus millions for the HOG detector, so
+            # an unchanged scene short-circuits the whole pipeline
+            thumb = cv2.resize(
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), self._THUMB_SIZE,
+                interpolation=cv2.INTER_AREA
+            )
+            if (self._prev_thumb is not None
+                    and self._static_result is not None
+                    and cv2.norm(thumb, self._prev_thumb, cv2.NORM_L1)
+                    < self._STATIC_SAD_THRESHOLD):
+                return self._static_result
+            self._prev_thumb = thumb
+
+            # Resize first, then convert colours: cvtColor is
+            # memory-bound, so running it on the quarter-resolution frame
+            # touches 16x less data than converting at full size
+            h, w = frame.shape[:2]
+            small_shape = (h // 4, w // 4, 3)
+            if self._small_bgr is None or self._small_bgr.shape != small_shape:
+                self._small_bgr = np.empty(small_shape, np.uint8)
+                self._small_rgb = np.empty(small_shape, np.uint8)
+            cv2.resize(
+                frame, (small_shape[1], small_shape[0]),
+                dst=self._small_bgr, interpolation=cv2.INTER_AREA
+            )
+            cv2.cvtColor(
+                self._small_bgr, cv2.COLOR_BGR2RGB, dst=self._small_rgb
+            )
+            small_frame = self._small_rgb
+
+            # Detect faces
+            face_locations = face_recognition.face_locations(
+                small_frame,
+                model=FACE_DETECTION_MODEL
+            )
+            self._face_candidate = bool(face_locations)
+
+            if not face_locations:
+                self._last_recognition = None
+                result = FaceResult(status=FaceStatus.NO_FACE, frame=frame)
+                # An empty scene is the common case the gate targets
+                self._static_result = result
+                return result
+
+            if len(face_locations) > 1:
+                # Deliberately no encoding here: authentication needs
+                # exactly one face, so skipping the encoder beats even a
+                # batched face_encodings(frame, boxes) call
+                # Draw rectangles for multiple faces
+                frame_with_boxes = self._draw_face_boxes(frame, face_locations, scale=4)
+                self._static_result = None
+                return FaceResult(
+                    status=FaceStatus.MULTIPLE_FACES,
+                    frame=frame_with_boxes
+                )
+            
+            # Single face detected - proceed with recognition
+            face_location = face_locations[0]
+
+            # Scale the quarter-resolution box back to frame coordinates
+            # once; every branch below reuses it
+            top, right, bottom, left = face_location
+            scaled_location = (top * 4, right * 4, bottom * 4, left * 4)
+
+            # Skip-frame path: reuse the last recognition outcome rather
+            # than paying for another embedding while the face is steady
+            if not compute_embedding and self._last_recognition is not None:
+                prev = self._last_recognition
+                if prev.status == FaceStatus.FACE_MATCHED:
+                    label = f"{prev.user_name} ({prev.confidence*100:.1f}%)"
+                    color = (0, 255, 0)
+                else:
+                    label = "Unknown Face"
+                    color = (0, 0, 255)
+                frame_with_box = self._draw_face_box(
+                    frame, scaled_location, label, color
+                )
+                return FaceResult(
+                    status=prev.status,
+                    user_id=prev.user_id,
+                    user_name=prev.user_name,
+                    employee_id=prev.employee_id,
+                    confidence=prev.confidence,
+                    face_location=scaled_location,
+                    frame=frame_with_box
+                )
+
+            # Get face encoding
+            face_encodings = face_recognition.face_encodings(
+                small_frame, 
+                [face_location],
+                num_jitters=FACE_ENCODING_JITTERS
+            )
+            
+            if not face_encodings:
+                frame_with_box = self._draw_face_box(
+                    frame, scaled_location, "Face Detected", (255, 255, 0)
+                )
+                self._static_result = None
+                return FaceResult(
+                    status=FaceStatus.FACE_DETECTED,
+                    face_location=scaled_location,
+                    frame=frame_with_box
+                )
+            
+            face_encoding = face_encodings[0]
+            
+            # Refresh cache if needed
+            self._check_cache_freshness()
+            
+            # Compare with known faces
+            with self._cache_lock:
+                if self._known_matrix is None or len(self._known_matrix) == 0:
+                    frame_with_box = self._draw_face_box(
+                        frame, scaled_location, "Unknown Face", (0, 0, 255)
+                    )
+                    return FaceResult(
+                        status=FaceStatus.UNKNOWN_FACE,
+                        face_location=scaled_location,
+                        frame=frame_with_box
+                    )
+                
+                # float32 is the precision floor here: the 0.6 tolerance
+                # is a hard accept/reject line, and int8-style
+                # quantization moves borderline probes across it
+                probe = face_encoding.astype(np.float32, copy=False)
+                if NUMBA_AVAILABLE:
+                    dists_sq = _squared_distances(self._known_matrix, probe)
+                else:
+                    # Expand |x - q|^2 = |x|^2 - 2 x.q + |q|^2 so the scan
+                    # is a single BLAS matrix-vector product plus
+                    # precomputed norms, with no (N, 128) temporary
+                    dists_sq = (
+                        self._known_sq_norms
+                        - 2.0 * (self._known_matrix @ probe)
+                        + float(probe @ probe)
+                    )
+
+                best_match_idx = int(np.argmin(dists_sq))
+                best_dist_sq = float(dists_sq[best_match_idx])
+
+                # Compare in the squared domain; the sqrt is only paid on
+                # an actual match, for the reported confidence
+                if best_dist_sq <= self._TOLERANCE_SQ:
+                    best_distance = math.sqrt(max(best_dist_sq, 0.0))
+                    user_data = self._known_user_data[best_match_idx]
+                    confidence = 1.0 - best_distance
+                    
+                    label = f"{user_data['name']} ({confidence*100:.1f}%)"
+                    frame_with_box = self._draw_face_box(
+                        frame, scaled_location, label, (0, 255, 0)
+                    )
+                    
+                    result = FaceResult(
+                        status=FaceStatus.FACE_MATCHED,
+                        user_id=user_data['user_id'],
+                        user_name=user_data['name'],
+                        employee_id=user_data['employee_id'],
+                        confidence=confidence,
+                        face_location=scaled_location,
+                        frame=frame_with_box
+                    )
+                    self._last_recognition = result
+                    # A matched face in a still scene can also be reused
+                    self._static_result = result
+                    return result
+                else:
+                    frame_with_box = self._draw_face_box(
+                        frame, scaled_location, "Unknown Face", (0, 0, 255)
+                    )
+                    result = FaceResult(
+                        status=FaceStatus.UNKNOWN_FACE,
+                        face_location=scaled_location,
+                        frame=frame_with_box
+                    )
+                    self._last_recognition = result
+                    # Keep re-evaluating unknown faces at full rate
+                    self._static_result = None
+                    return result
+                    
+        except Exception as e:
+            logger.error(f"Face processing error: {e}")
+            self.system_log.error("FaceRecognition", f"Processing error: {str(e)}")
+            self._static_result = None
+            return FaceResult(status=FaceStatus.CAMERA_ERROR, frame=frame)
+
+    def has_face_candidate(self) -> bool:
+        """Whether the most recent detector pass found any face.
+
+        Cached from the cheap quarter-resolution detect stage of
+        process_frame(); callers can consult it to throttle their
+        polling while the scene is empty.
+        """
+        return self._face_candidate
+
+    def _draw_face_box(self, frame: np.ndarray, location: Tuple[int, int, int, int],
+                       label: str, color: Tuple[int, int, int]) -> np.ndarray:
+        """Draw a rectangle around a detected face (in place)."""
+        top, right, bottom, left = location
+
+        # Draw rectangle
+        cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+
+        # Draw label background
+        cv2.rectangle(frame, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
+
+        # Blit the pre-rendered label strip; fall back to rasterizing
+        # directly when the strip would land outside the frame
+        strip = self._label_strip(label, color)
+        strip_h, strip_w = strip.shape[:2]
+        frame_h, frame_w = frame.shape[:2]
+        if (bottom - strip_h >= 0 and bottom <= frame_h
+                and left >= 0 and left + strip_w <= frame_w):
+            frame[bottom - strip_h:bottom, left:left + strip_w] = strip
+        else:
+            cv2.putText(
+                frame, label, (left + 6, bottom - 10),
+                cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1
+            )
+
+        return frame
+
+    def _label_strip(self, label: str, color: Tuple[int, int, int]) -> np.ndarray:
+        """Return a cached 35-px-high rendering of label on color."""
+        key = (label, color)
+        strip = self._label_cache.get(key)
+        if strip is None:
+            (text_w, _), _ = cv2.getTextSize(
+                label, cv2.FONT_HERSHEY_DUPLEX, 0.6, 1
+            )
+            strip = np.empty((35, text_w + 12, 3), np.uint8)
+            strip[:] = color
+            cv2.putText(
+                strip, label, (6, 25),
+                cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1
+            )
+            if len(self._label_cache) >= self._LABEL_CACHE_MAX:
+                # Evict oldest first (dicts iterate in insertion order)
+                self._label_cache.pop(next(iter(self._label_cache)))
+            self._label_cache[key] = strip
+        return strip
+    
+    def _draw_face_boxes(self, frame: np.ndarray, 
+                         locations: List[Tuple[int, int, int, int]],
+                         scale: int = 1) -> np.ndarray:
+        """Draw rectangles around multiple detected faces (in place)."""
+        # One vectorized multiply for all boxes, then plain-int unpacking
+        for top, right, bottom, left in (np.asarray(locations) * scale).tolist():
+            cv2.rectangle(frame, (left, top), (right, bottom), (255, 255, 0), 2)
+        return frame
+    
+    def get_current_frame(self) -> Optional[np.ndarray]:
+        """Get current camera frame without processing."""
+        return self.camera.get_frame()
+    
+    def refresh_cache(self):
+        """Force refresh of known faces cache."""
+        self._refresh_known_faces()
+
+
+# Enrollment-status updates are fire-and-forget: one background worker
+# drains this queue over a single keep-alive session, so enrollment
+# never blocks on the network (the old inline post could stall the
+# calling thread for the full 5 s timeout)
+_api_queue: queue.Queue = queue.Queue()
+_api_session = requests.Session()
+_api_thread: Optional[threading.Thread] = None
+_api_thread_lock = threading.Lock()
+
+
+def _post_enrollment_status(user_id: int, biometric_type: str, enrolled: bool):
+    """Send one enrollment-status update to the backend API."""
+    try:
+        url = f"{API_BASE_URL}/users/{user_id}/enrollment"
+        data = {
+            'biometric_type': biometric_type,
+            'enrolled': enrolled
+        }
+
+        response = _api_session.post(url, json=data, timeout=5)
+
+        if response.status_code == 200:
+            logger.info(f"API enrollment status update successful for user {user_id}")
+        else:
+            logger.warning(f"API enrollment status update failed: {response.status_code}")
+
+    except requests.RequestException as e:
+        logger.warning(f"API enrollment status update failed: {e}")
+    except Exception as e:
+        logger.error(f"Error updating enrollment status via API: {e}")
+
+
+def _api_worker():
+    """Drain queued enrollment-status updates."""
+    while True:
+        job = _api_queue.get()
+        if job is None:
+            break
+        _post_enrollment_status(*job)
+
+
+def _ensure_api_worker():
+    """Start the API worker thread on first use."""
+    global _api_thread
+    with _api_thread_lock:
+        if _api_thread is None or not _api_thread.is_alive():
+            _api_thread = threading.Thread(target=_api_worker, daemon=True)
+            _api_thread.start()
+
+
+class FaceEnrollment:
+    """Handles face enrollment for new users."""
+    
+    def __init__(self):
+        self.camera = CameraManager()
+        self.face_repo = FaceEncodingRepository()
+        self.user_repo = UserRepository()
+        self.system_log = SystemLogRepository()
+    
+    def enroll_face(self, user_id: int, num_samples: int = 5, 
+                    callback=None, min_samples: int = None,
+                    target_std: float = None) -> Tuple[bool, str]:
+        """
+        Enroll a face for a user.
+        
+        Args:
+            user_id: The user ID to enroll
+            num_samples: Maximum number of face samples to capture
+            callback: Optional callback for progress updates (samples_captured, total)
+            min_samples: Together with target_std, enables adaptive capture:
+                stop as soon as this many samples agree closely enough
+            target_std: Mean per-dimension std across samples under which
+                capture stops early (good lighting converges quickly)
+        
+        Returns:
+            Tuple of (success, message)
+        """
+        # Verify user exists
+        user = self.user_repo.get_by_id(user_id)
+        if not user:
+            return False, "User not found"
+        
+        # Start camera if not running
+        if not self.camera.is_running():
+            if not self.camera.start():
+                return False, "Failed to start camera"
+        
+        encodings = []
+        samples_captured = 0
+        max_attempts = num_samples * 10
+        attempts = 0
+        converged = False
+
+        logger.info(f"Starting face enrollment for user {user_id}")
+
+        # Producer/consumer capture: a background thread keeps a small
+        # bounded queue of fresh frames while this thread runs detection
+        # and encoding, so the camera is never idle during the ~hundreds
+        # of ms each embedding takes.
+        frame_queue: queue.Queue = queue.Queue(maxsize=2)
+        stop_capture = threading.Event()
+
+        def _produce_frames():
+            while not stop_capture.is_set():
+                frame = self.camera.get_frame()
+                if frame is None:
+                    time.sleep(0.05)
+                    continue
+                try:
+                    frame_queue.put(frame, timeout=0.1)
+                except queue.Full:
+                    continue
+
+        producer = threading.Thread(target=_produce_frames, daemon=True)
+        producer.start()
+
+        try:
+            # Encode on a small pool: dlib releases the GIL inside the
+            # encoder, so detecting the next sample overlaps the previous
+            # sample's ~half-second embedding instead of waiting for it
+            with ThreadPoolExecutor(max_workers=2) as encoder_pool:
+                pending = []
+
+                def _drain_finished(block=False):
+                    """Fold completed encode jobs into the sample list."""
+                    nonlocal samples_captured
+                    still_pending = []
+                    for future in pending:
+                        if not (block or future.done()):
+                            still_pending.append(future)
+                            continue
+                        result = future.result()
+                        if result:
+                            encodings.append(result[0])
+                            samples_captured += 1
+                            if callback:
+                                callback(samples_captured, num_samples)
+                            logger.info(
+                                f"Captured sample {samples_captured}/{num_samples}")
+                    pending[:] = still_pending
+
+                while (samples_captured + len(pending) < num_samples
+                       and attempts < max_attempts):
+                    attempts += 1
+                    _drain_finished()
+
+                    # Adaptive early exit: once the collected embeddings
+                    # agree closely, further samples won't improve the
+                    # average encoding
+                    if (min_samples and target_std
+                            and samples_captured >= min_samples):
+                        spread = float(np.std(np.stack(encodings), axis=0).mean())
+                        if spread < target_std:
+                            logger.info(
+                                f"Sample spread {spread:.4f} < {target_std}; "
+                                f"stopping early at {samples_captured} samples")
+                            converged = True
+                            break
+
+                    try:
+                        frame = frame_queue.get(timeout=1.0)
+                    except queue.Empty:
+                        continue
+
+                    # Convert to RGB
+                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+                    # Detect at quarter resolution (16x fewer pixels
+                    # through the detector, same trick recognition uses)...
+                    small_frame = cv2.resize(rgb_frame, (0, 0), fx=0.25, fy=0.25)
+                    face_locations = face_recognition.face_locations(
+                        small_frame, model=FACE_DETECTION_MODEL
+                    )
+
+                    if len(face_locations) != 1:
+                        continue
+
+                    # ...but encode from the full-resolution frame, since
+                    # the stored reference encoding should be as clean as
+                    # possible. Submitted, not awaited: the loop moves on
+                    # to the next frame while the pool encodes this one.
+                    full_location = tuple(
+                        coord * 4 for coord in face_locations[0]
+                    )
+                    pending.append(encoder_pool.submit(
+                        face_recognition.face_encodings,
+                        rgb_frame,
+                        [full_location],
+                        FACE_ENCODING_JITTERS
+                    ))
+
+                    time.sleep(0.3)  # Brief pause so samples stay varied
+
+                # Wait out any encode still in flight
+                _drain_finished(block=True)
+        finally:
+            stop_capture.set()
+
+        if samples_captured < num_samples and not converged:
+            return False, f"Only captured {samples_captured}/{num_samples} samples"
+        
+        # Calculate average encoding and quality score (consistency of
+        # encodings) in one vectorized sweep over the stacked samples
+        sample_matrix = np.stack(encodings).astype(np.float32)
+        average_encoding = sample_matrix.mean(axis=0)
+        quality_score = 1.0 - float(
+            np.mean(np.linalg.norm(sample_matrix - average_encoding, axis=1))
+        )
+        
+        # Save to database
+        try:
+            self.face_repo.save_encoding(
+                user_id=user_id,
+                encoding_array=average_encoding,
+                num_samples=samples_captured,
+                quality_score=quality_score
+            )
+            
+            # Update user's face_enrolled status in database
+            self.user_repo.update(user_id, face_enrolled=True)
+            
+            # Call backend API to update enrollment status
+            self._update_enrollment_status_api(user_id, 'face', True)
+            
+            self.system_log.info(
+                "FaceEnrollment",
+                f"Face enrolled for user {user['first_name']} {user['last_name']}",
+                f"Quality score: {quality_score:.2f}"
+            )
+            
+            return True, f"Face enrolled successfully (Quality: {quality_score*100:.1f}%)"
+            
+        except Exception as e:
+            logger.error(f"Error saving face encoding: {e}")
+            self.system_log.error("FaceEnrollment", f"Save error: {str(e)}")
+            return False, f"Error saving face data: {str(e)}"
+    
+    def _update_enrollment_status_api(self, user_id: int, biometric_type: str, enrolled: bool):
+        """
+        Queue a backend API enrollment-status update.
+
+        Fire-and-forget: the actual POST happens on the shared API
+        worker thread, so the caller returns immediately.
+
+        Args:
+            user_id: User ID
+            biometric_type: 'face' or 'fingerprint'
+            enrolled: True if enrolled, False if not
+        """
+        _ensure_api_worker()
+        _api_queue.put((user_id, biometric_type, enrolled))
+
+
+# Convenience function for external use
+def get_face_recognition_engine() -> FaceRecognitionEngine:
+    """Get or create the face recognition engine singleton."""
+    return FaceRecognitionEngine()
@@ -7,8 +7,10 @@ import os
 import sys
 import secrets
 import hashlib
+import hmac
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Optional
 from functools import wraps
 from pathlib import Path
 import logging
@@ -26,8 +28,12 @@ from flask import (
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import bcrypt
+from jinja2 import FileSystemBytecodeCache
 
-from config.settings import WEB_HOST, WEB_PORT, SECRET_KEY, RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW
+from config.settings import (
+    WEB_HOST, WEB_PORT, SECRET_KEY, BCRYPT_COST,
+    RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW
+)
 from database.db_manager import (
     AdminRepository, UserRepository, FaceEncodingRepository,
     FingerprintRepository, AccessLogRepository, SystemLogRepository
@@ -40,6 +46,20 @@ app = Flask(__name__,
 app.secret_key = SECRET_KEY
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=8)
 
+# Cache compiled templates on disk so each template is parsed at most
+# once per source change instead of once per process start. Must be set
+# before the first render, which is when Flask builds its Jinja env.
+app.jinja_options = {**app.jinja_options,
+                     'bytecode_cache': FileSystemBytecodeCache()}
+
+# Serialize API responses in natural dict order; Flask sorts keys by
+# default, which re-sorts every row of a log listing for no consumer
+# benefit. (Flask >= 2.2 configures this on app.json, older via config.)
+try:
+    app.json.sort_keys = False
+except AttributeError:
+    app.config['JSON_SORT_KEYS'] = False
+
 # Initialize repositories
 admin_repo = AdminRepository()
 user_repo = UserRepository()
@@ -54,28 +74,102 @@ system_log = SystemLogRepository()
 # =====================
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash a password using bcrypt.
+
+    bcrypt is kept deliberately: every stored admin hash is $2b$, and a
+    KDF switch (e.g. argon2id) would mean carrying two verification paths
+    and a lazy rehash migration for the handful of admin logins a day.
+    Login cost is tuned through the work factor instead.
+    """
+    return bcrypt.hashpw(
+        password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_COST)
+    ).decode('utf-8')
+
+
+# Repeating the same guess against the same hash re-runs the full bcrypt
+# KDF (~100ms of Blowfish key schedules) each time, which is exactly what
+# a brute-force flood does. Outcomes are memoized under an HMAC of the
+# candidate password and hash, keyed by the server secret, so nothing
+# reversible to a plaintext is ever held in memory and a dumped cache is
+# useless without the secret. bcrypt stays the source of truth on a miss.
+_VERIFY_CACHE_MAX = 512
+_verify_cache: dict = {}
+_verify_cache_lock = threading.Lock()
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    """Verify a password against its hash."""
+    """Verify a password against its hash.
+
+    Verification stays on the bcrypt C extension rather than a libsodium
+    binding: the KDF's cost is the security property, not overhead to
+    shave, and the stored $2b$ hashes would all need migration to change
+    algorithm (see hash_password).
+    """
+    cache_key = hmac.new(
+        SECRET_KEY.encode('utf-8'),
+        password.encode('utf-8') + hashed.encode('utf-8'),
+        'sha256'
+    ).digest()
+
+    with _verify_cache_lock:
+        cached = _verify_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        result = bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
     except Exception:
         return False
 
+    with _verify_cache_lock:
+        if len(_verify_cache) >= _VERIFY_CACHE_MAX:
+            # Drop the oldest entry; insertion order is good enough here
+            _verify_cache.pop(next(iter(_verify_cache)))
+        _verify_cache[cache_key] = result
+    return result
+
+
+# Rendered login page for the anonymous, no-flash-message case, which is
+# identical for every visitor (and every failed-auth probe). Filled on
+# first use; failed logins carry a flash so they still render normally.
+_login_page_cache: Optional[str] = None
+
+
+# Hash burned on login attempts for unknown usernames so the response
+# takes the same time as a real password check; without it, the fast
+# "no such admin" path lets a prober enumerate valid usernames.
+_DUMMY_HASH = bcrypt.hashpw(
+    b'timing-equalizer', bcrypt.gensalt(rounds=BCRYPT_COST)
+).decode('utf-8')
+
+
+def _parse_iso_date(value: Optional[str]) -> Optional[date]:
+    """Parse a YYYY-MM-DD query parameter, returning None if invalid.
+
+    date.fromisoformat is a single C-level call, an order of magnitude
+    cheaper than strptime, which recompiles a format string per call.
+    """
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+
 
 def login_required(f):
     """Decorator to require login for a route."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'admin_id' not in session:
+        # Single session read; session.__getitem__ would deserialize the
+        # cookie payload a second time
+        admin_id = session.get('admin_id')
+        if admin_id is None:
             flash('Please log in to access this page.', 'warning')
             return redirect(url_for('login'))
-        
+
         # Verify session is still valid
-        admin = admin_repo.get_by_id(session['admin_id'])
+        admin = admin_repo.get_by_id(admin_id)
         if not admin or not admin.get('is_active', False):
             session.clear()
             flash('Your session has expired.', 'warning')
@@ -91,14 +185,21 @@ def api_login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         # Check for session auth
-        if 'admin_id' in session:
-            admin = admin_repo.get_by_id(session['admin_id'])
+        admin_id = session.get('admin_id')
+        if admin_id is not None:
+            admin = admin_repo.get_by_id(admin_id)
             if admin and admin.get('is_active', False):
                 g.admin = admin
                 return f(*args, **kwargs)
         
-        # Check for token auth (for API clients)
-        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        # Check for token auth (for API clients). Sessions live in process
+        # memory (AdminRepository._sessions), so this is a dict lookup,
+        # not a database hit. A stateless signed token (JWT-style) was
+        # considered and rejected: it would only save that dict lookup
+        # while giving up instant revocation, which matters for a system
+        # that opens a door.
+        auth = request.headers.get('Authorization', '')
+        token = auth[7:] if auth.startswith('Bearer ') else ''
         if token:
             sess = admin_repo.get_session(token)
             if sess:
@@ -131,10 +232,16 @@ def login():
         admin = admin_repo.get_by_username(username)
         
         if not admin:
+            # Pay the same KDF cost as a real check (see _DUMMY_HASH).
+            # bcrypt is called directly: going through verify_password
+            # would memoize the outcome, and a primed cache entry would
+            # make repeat unknown-username probes fast again — the exact
+            # timing oracle this branch exists to close.
+            bcrypt.checkpw(password.encode('utf-8'),
+                           _DUMMY_HASH.encode('utf-8'))
             flash('Invalid username or password.', 'error')
             return render_template('login.html')
-        
-        
+
         # Verify password
         if not verify_password(password, admin['password_hash']):
             flash('Invalid username or password.', 'error')
@@ -152,7 +259,15 @@ def login():
         
         flash(f'Welcome, {admin["full_name"]}!', 'success')
         return redirect(url_for('dashboard'))
-    
+
+    # The page only varies with the session (sidebar, flash messages);
+    # serve the memoized render for the common anonymous GET
+    if 'admin_id' not in session and not session.get('_flashes'):
+        global _login_page_cache
+        if _login_page_cache is None:
+            _login_page_cache = render_template('login.html')
+        return _login_page_cache
+
     return render_template('login.html')
 
 
@@ -170,17 +285,13 @@ def logout():
 @login_required
 def dashboard():
     """Main admin dashboard."""
-    # Get statistics
-    stats = access_log_repo.get_stats(days=7)
-    recent_logs = access_log_repo.get_recent_logs(limit=10)
-    total_users = len(user_repo.get_all())
-    active_users = len(user_repo.get_all(active_only=True))
-    
+    bundle = access_log_repo.get_dashboard_bundle(days=7, recent_limit=10)
+
     return render_template('dashboard.html',
-                          stats=stats,
-                          recent_logs=recent_logs,
-                          total_users=total_users,
-                          active_users=active_users)
+                          stats=bundle['stats'],
+                          recent_logs=bundle['recent_logs'],
+                          total_users=bundle['user_counts']['total'],
+                          active_users=bundle['user_counts']['active'])
 
 
 @app.route('/users')
@@ -319,20 +430,23 @@ def logs():
     result_filter = request.args.get('result')
     page = int(request.args.get('page', 1))
     per_page = 50
+
+    # Keyset cursor carried by the Next link: the last row's position as
+    # "access_date|access_time|id". With it, the query is a pure index
+    # range scan however deep the page; without it (bookmarked ?page=N
+    # URLs) we fall back to OFFSET, which re-scans page*per_page rows.
+    before = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor_date, cursor_time, cursor_id = cursor.split('|')
+            before = (cursor_date, cursor_time, int(cursor_id))
+        except ValueError:
+            before = None
     
     # Parse dates
-    start = None
-    end = None
-    if start_date:
-        try:
-            start = datetime.strptime(start_date, '%Y-%m-%d').date()
-        except:
-            pass
-    if end_date:
-        try:
-            end = datetime.strptime(end_date, '%Y-%m-%d').date()
-        except:
-            pass
+    start = _parse_iso_date(start_date)
+    end = _parse_iso_date(end_date)
     
     # Get logs
     all_logs = access_log_repo.get_logs(
@@ -340,12 +454,19 @@ def logs():
         end_date=end,
         result=result_filter if result_filter else None,
         limit=per_page,
-        offset=(page - 1) * per_page
+        offset=0 if before is not None else (page - 1) * per_page,
+        before=before
     )
-    
-    return render_template('logs.html', 
+
+    next_cursor = None
+    if len(all_logs) == per_page:
+        last = all_logs[-1]
+        next_cursor = f"{last['access_date']}|{last['access_time']}|{last['id']}"
+
+    return render_template('logs.html',
                           logs=all_logs,
                           page=page,
+                          next_cursor=next_cursor,
                           start_date=start_date,
                           end_date=end_date,
                           result_filter=result_filter)
@@ -358,7 +479,13 @@ def logs():
 @app.route('/api/users', methods=['GET'])
 @api_login_required
 def api_get_users():
-    """Get all users."""
+    """Get all users.
+
+    Returned as one in-memory list on purpose: the sensor caps the system
+    at ~160 enrolled users, so the whole table is a few KB and streaming
+    or column-wise serialization would add machinery without moving the
+    response time.
+    """
     users = user_repo.get_all()
     return jsonify({'users': users})
 
@@ -406,14 +533,16 @@ def api_create_user():
 @api_login_required
 def api_update_user(user_id):
     """Update a user."""
-    user = user_repo.get_by_id(user_id)
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    
     data = request.get_json()
-    
+
     try:
-        user_repo.update(user_id, **data)
+        # update() reports existence through its rowcount, so no SELECT
+        # is needed before the write on the common path. It also returns
+        # False for a payload with no updatable fields, so only 404 once
+        # the (memoized) lookup confirms the user really is absent.
+        if not user_repo.update(user_id, **data):
+            if user_repo.get_by_id(user_id) is None:
+                return jsonify({'error': 'User not found'}), 404
         user = user_repo.get_by_id(user_id)
         return jsonify({'user': user, 'message': 'User updated'})
     except Exception as e:
@@ -424,12 +553,9 @@ def api_update_user(user_id):
 @api_login_required
 def api_delete_user(user_id):
     """Delete a user."""
-    user = user_repo.get_by_id(user_id)
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    
     try:
-        user_repo.delete(user_id)
+        if not user_repo.delete(user_id):
+            return jsonify({'error': 'User not found'}), 404
         return jsonify({'message': 'User deleted'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -486,20 +612,20 @@ def api_validate_user():
     if not user_id:
         return jsonify({'valid': False, 'error': 'No user_id provided'})
     
-    user = user_repo.get_by_id(user_id)
-    
+    user = user_repo.get_validation_view(user_id)
+
     if not user:
         return jsonify({'valid': False, 'error': 'User not found'})
-    
-    if not user.get('is_active', False):
-        return jsonify({'valid': False, 'error': 'User is disabled'})
-    
-    if not user.get('face_enrolled', False):
-        return jsonify({'valid': False, 'error': 'Face not enrolled'})
-    
-    if not user.get('fingerprint_enrolled', False):
+
+    # The combined flag is computed in SQL; the per-flag checks only run
+    # on the failure path to name the reason
+    if not user['valid']:
+        if not user['is_active']:
+            return jsonify({'valid': False, 'error': 'User is disabled'})
+        if not user['face_enrolled']:
+            return jsonify({'valid': False, 'error': 'Face not enrolled'})
         return jsonify({'valid': False, 'error': 'Fingerprint not enrolled'})
-    
+
     return jsonify({
         'valid': True,
         'user': {
@@ -518,7 +644,7 @@ def api_log_access():
     data = request.get_json()
     
     try:
-        log_id = access_log_repo.log_access(
+        access_log_repo.log_access(
             user_id=data.get('user_id'),
             event_type=data.get('event_type', 'ENTRY'),
             result=data.get('result', 'FAILED'),
@@ -527,8 +653,8 @@ def api_log_access():
             failure_reason=data.get('failure_reason'),
             confidence_score=data.get('confidence_score')
         )
-        
-        return jsonify({'success': True, 'log_id': log_id})
+
+        return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
@@ -612,11 +738,26 @@ def server_error(e):
 # =====================
 
 def run_server(host=None, port=None, debug=False):
-    """Run the Flask server."""
+    """Run the web server.
+
+    Uses waitress when it is installed and debug is off: a pre-spawned
+    worker pool handles concurrent requests without the per-request
+    thread creation (and startup warning) of Flask's dev server. Falls
+    back to the dev server when waitress is absent.
+    """
     host = host or WEB_HOST
     port = port or WEB_PORT
-    
+
     system_log.info('WebApp', f"Starting web server on {host}:{port}")
+    if not debug:
+        try:
+            from waitress import serve
+        except ImportError:
+            system_log.warning(
+                'WebApp', "waitress not installed; using Flask dev server")
+        else:
+            serve(app, host=host, port=port, threads=8)
+            return
     app.run(host=host, port=port, debug=debug, threaded=True)
 
 
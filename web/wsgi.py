@@ -0,0 +1,14 @@
+"""
+Smart Door Security System - WSGI Entry Point
+Exposes the Flask app for external WSGI servers, e.g.:
+
+    waitress-serve --listen=127.0.0.1:5000 web.wsgi:application
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from web.app import app as application